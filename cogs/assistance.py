@@ -3,6 +3,8 @@ from discord import app_commands, Interaction, Embed
 from discord.ext import commands
 from discord.ext.commands import CooldownMapping, BucketType
 
+from utils.permissions import require
+
 # ------------------------------
 # SETTINGS
 # ------------------------------
@@ -17,14 +19,6 @@ COLOR_SCHEME = 0xE7BB19  # Department gray
 ASSISTANCE_COOLDOWN = CooldownMapping.from_cooldown(1, 21600, BucketType.user)  # 6 hours
 
 
-def can_use_assistance_command(user):
-    return any(role.id == ASSISTANCE_ROLE_ID for role in user.roles) or user.id == ADMIN_USER_ID
-
-
-def can_use_force_request(user):
-    return any(role.id == FORCE_REQUEST_ROLE_ID for role in user.roles) or user.id == ADMIN_USER_ID
-
-
 class AssistanceCog(commands.Cog):
     """Handles officer assistance requests."""
 
@@ -41,11 +35,8 @@ class AssistanceCog(commands.Cog):
         app_commands.Choice(name="2 - High (Ping @here)", value=2),
         app_commands.Choice(name="3 - Normal (No ping)", value=3)
     ])
+    @require(ASSISTANCE_ROLE_ID, users=(ADMIN_USER_ID,))
     async def assistance_request(self, interaction: Interaction, priority: app_commands.Choice[int], reason: str):
-        if not can_use_assistance_command(interaction.user):
-            await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
-            return
-
         bucket = ASSISTANCE_COOLDOWN.get_bucket(interaction)
         retry_after = bucket.update_rate_limit()
         if retry_after:
@@ -72,11 +63,8 @@ class AssistanceCog(commands.Cog):
         app_commands.Choice(name="2 - High (Ping @here)", value=2),
         app_commands.Choice(name="3 - Normal (No ping)", value=3)
     ])
+    @require(FORCE_REQUEST_ROLE_ID, users=(ADMIN_USER_ID,))
     async def force_request(self, interaction: Interaction, priority: app_commands.Choice[int], reason: str):
-        if not can_use_force_request(interaction.user):
-            await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
-            return
-
         await self._send_assistance_embed(interaction, priority.value, reason)
         await interaction.response.send_message(
             f"Force assistance request sent with priority {priority.value}.", ephemeral=True
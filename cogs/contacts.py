@@ -1,6 +1,10 @@
 import discord
 from discord.ext import commands
 from datetime import datetime
+import time
+
+from utils.attachments import AttachmentRelay, note_skipped
+from utils.instrumentation import timed
 
 # ------------------------------
 # CONFIGURATION
@@ -8,6 +12,7 @@ from datetime import datetime
 FORUM_CHANNEL_ID = 1417027487627608204  # Forum channel for contact posts
 ROLE_CONTACT_NOTIFY = 1416876088331604048  # Role to ping when ticket created
 EMOJI_CONFIRM = 1411408394476322846  # Reaction emoji ID
+PROMPT_COOLDOWN = 300  # Seconds before a user without a ticket is prompted again
 
 # Elevation roles
 ROLE_HIGH_COMMAND = 1416873675830857759      # High Command
@@ -20,11 +25,87 @@ ROLE_DEPT_ADMIN = 1416873742746783764        # Department Administration
 ROLE_SERVER_MANAGEMENT = 1418421753629376624 # Server Management
 
 
+class TicketIndex:
+    """Open tickets indexed both ways: opener id -> thread id and thread id -> opener id."""
+
+    def __init__(self):
+        self.thread_by_user: dict[int, int] = {}
+        self.user_by_thread: dict[int, int] = {}
+
+    def __len__(self):
+        return len(self.thread_by_user)
+
+    def thread_for(self, user_id: int) -> int | None:
+        return self.thread_by_user.get(user_id)
+
+    def user_for(self, thread_id: int) -> int | None:
+        return self.user_by_thread.get(thread_id)
+
+    def open(self, user_id: int, thread_id: int):
+        self.close(user_id)
+        self.thread_by_user[user_id] = thread_id
+        self.user_by_thread[thread_id] = user_id
+
+    def close(self, user_id: int) -> int | None:
+        thread_id = self.thread_by_user.pop(user_id, None)
+        if thread_id is not None:
+            self.user_by_thread.pop(thread_id, None)
+        return thread_id
+
+
 class ContactSystem(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.active_tickets = {}
+        self.tickets = TicketIndex()
         self.ignore_messages = set()
+        self.attachments = AttachmentRelay()
+        self.prompted: dict[int, float] = {}  # user id -> monotonic time of their last prompt
+        self.prompt_embed = discord.Embed(
+            title="Need Assistance?",
+            description=(
+                "If you have a concern or require assistance, please create a support ticket by pressing the button below. "
+                "Your request will be directed to the **Senora Valley Police Department Supervisory Board**."
+            ),
+            color=0xE7BB19,
+        )
+
+    async def cog_load(self):
+        # One query rebuilds every open ticket; a single persistent view serves all ticket posts
+        for ticket in await self.bot.persistence.run(self.bot.storage.load_tickets):
+            self.tickets.open(ticket["user_id"], ticket["thread_id"])
+        self.ticket_controls = TicketControls(self)
+        self.bot.add_view(self.ticket_controls)
+        self.contact_prompt = ContactPrompt(self)
+        self.bot.add_view(self.contact_prompt)
+        self.bot.metrics.gauge("tickets_open", "Open contact tickets.", lambda: len(self.tickets))
+
+    async def cog_unload(self):
+        await self.attachments.close()
+
+    # Ticket state changes are written one row at a time as they happen
+    def open_ticket(self, user_id: int, thread_id: int):
+        self.tickets.open(user_id, thread_id)
+        self.bot.persistence.write(("ticket", user_id), self.bot.storage.save_ticket, user_id, thread_id, time.time())
+
+    def elevate_ticket(self, user_id: int, elevated_to: str):
+        self.bot.persistence.write(
+            ("ticket_elevation", user_id), self.bot.storage.set_ticket_elevation, user_id, elevated_to
+        )
+
+    def close_ticket(self, user_id: int):
+        self.tickets.close(user_id)
+        self.bot.persistence.write(("ticket", user_id), self.bot.storage.delete_ticket, user_id)
+
+    def should_prompt(self, user_id: int) -> bool:
+        """True at most once per PROMPT_COOLDOWN for each user."""
+        now = time.monotonic()
+        if len(self.prompted) > 1000:
+            self.prompted = {uid: at for uid, at in self.prompted.items() if now - at < PROMPT_COOLDOWN}
+        last = self.prompted.get(user_id)
+        if last is not None and now - last < PROMPT_COOLDOWN:
+            return False
+        self.prompted[user_id] = now
+        return True
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -33,74 +114,73 @@ class ContactSystem(commands.Cog):
 
         # Handle DMs from users
         if isinstance(message.channel, discord.DMChannel):
-            if message.author.id in self.active_tickets:
-                thread = self.bot.get_channel(self.active_tickets[message.author.id])
+            thread_id = self.tickets.thread_for(message.author.id)
+            if thread_id is not None:
+                thread = self.bot.get_channel(thread_id)
                 if thread:
                     embed = discord.Embed(
                         title="New Reply",
-                        description=message.content,
+                        description=message.content or None,
                         color=0xE7BB19,
                     )
                     embed.set_thumbnail(
                         url="https://cdn.discordapp.com/attachments/1411384487694307349/1411384964133421107/icon_26.png"
                     )
-                    sent = await thread.send(embed=embed)
+                    # Attachments are streamed through temp files and posted with the reply
+                    async with self.attachments.spooled(message.attachments) as (files, skipped):
+                        note_skipped(embed, skipped)
+                        sent = await thread.send(embed=embed, files=files)
                     try:
                         await sent.add_reaction(self.bot.get_emoji(EMOJI_CONFIRM))
                     except:
                         pass
                 return
 
-            # Initial DM prompt if no ticket
-            view = discord.ui.View()
-            view.add_item(ContactButton(self))
-            embed = discord.Embed(
-                title="Need Assistance?",
-                description=(
-                    "If you have a concern or require assistance, please create a support ticket by pressing the button below. "
-                    "Your request will be directed to the **Senora Valley Police Department Supervisory Board**."
-                ),
-                color=0xE7BB19,
-            )
-            await message.channel.send(embed=embed, view=view)
+            # Initial DM prompt if no ticket; several messages in a row get one prompt
+            if self.should_prompt(message.author.id):
+                await message.channel.send(embed=self.prompt_embed, view=self.contact_prompt)
 
         # Handle staff replies in ticket threads
         elif message.guild:
-            if message.id in self.ignore_messages:
+            # Most guild messages are not in a ticket thread; drop them with one dict lookup
+            user_id = self.tickets.user_for(message.channel.id)
+            if user_id is None or message.id in self.ignore_messages:
                 return
 
-            for user_id, thread_id in self.active_tickets.items():
-                if message.channel.id == thread_id:
-                    user = await self.bot.fetch_user(user_id)
-                    if not user:
-                        return
-
-                    rank, color, logo = self.get_rank_info(message.author)
-                    embed = discord.Embed(description=message.content, color=color)
-                    embed.set_author(name=rank, icon_url=logo)
-
-                    try:
-                        sent = await user.send(embed=embed)
-                        await sent.add_reaction(self.bot.get_emoji(EMOJI_CONFIRM))
-                    except:
-                        pass
-                    break
+            rank, color, logo = self.get_rank_info(message.author)
+            embed = discord.Embed(description=message.content or None, color=color)
+            embed.set_author(name=rank, icon_url=logo)
+
+            # Delivered by the DM queue, which only needs the opener's id (no user fetch);
+            # the confirmation reaction follows delivery
+            emoji = self.bot.get_emoji(EMOJI_CONFIRM)
+            async with self.attachments.spooled(message.attachments) as (files, skipped):
+                note_skipped(embed, skipped)
+                delivery = self.bot.dm_queue.enqueue(
+                    user_id,
+                    embed=embed,
+                    files=files,
+                    on_sent=(lambda sent: sent.add_reaction(emoji)) if emoji else None,
+                )
+                if files:
+                    await delivery  # the temp files must stay open until the queue has sent them
 
     def get_rank_info(self, member: discord.Member):
         """Assigns rank display based on role hierarchy"""
-        if any(r.id == ROLE_SERVER_MANAGEMENT for r in member.roles):
+        roles = self.bot.permissions.roles_of(member)
+        if ROLE_SERVER_MANAGEMENT in roles:
             return (
                 "Server Management",
                 0xE7BB19,
                 "https://media.discordapp.net/attachments/1400897643772907640/1424180413076606977/Untitled_design_4.png?ex=69107e9e&is=690f2d1e&hm=74989a85019ed50ac5814b2ce101c204b3f26cfe13a3d62351af0d34c5e76cad&=&format=webp&quality=lossless",
             )
-        if any(r.id == ROLE_DEPT_ADMIN for r in member.roles):
+        if ROLE_DEPT_ADMIN in roles:
             return (
                 "Department Administration",
                 0xE7BB19,
                 "https://media.discordapp.net/attachments/1400897643772907640/1424180413076606977/Untitled_design_4.png?ex=69107e9e&is=690f2d1e&hm=74989a85019ed50ac5814b2ce101c204b3f26cfe13a3d62351af0d34c5e76cad&=&format=webp&quality=lossless",
             )
-        if any(r.id == ROLE_SUPERVISOR for r in member.roles):
+        if ROLE_SUPERVISOR in roles:
             return (
                 "Department Supervisor",
                 0xE7BB19,
@@ -118,13 +198,22 @@ class ContactSystem(commands.Cog):
 # ------------------------------
 class ContactButton(discord.ui.Button):
     def __init__(self, cog: ContactSystem):
-        super().__init__(label="Contact us here!", style=discord.ButtonStyle.secondary)
+        super().__init__(label="Contact us here!", style=discord.ButtonStyle.secondary, custom_id="contact_ticket:open")
         self.cog = cog
 
+    @timed("contact_open")
     async def callback(self, interaction: discord.Interaction):
         await interaction.response.send_modal(ContactModal(self.cog, interaction.user))
 
 
+class ContactPrompt(discord.ui.View):
+    """Persistent view behind every "Need Assistance?" prompt."""
+
+    def __init__(self, cog: ContactSystem):
+        super().__init__(timeout=None)
+        self.add_item(ContactButton(cog))
+
+
 class ContactModal(discord.ui.Modal, title="Contact Form"):
     def __init__(self, cog: ContactSystem, user: discord.User):
         super().__init__(timeout=None)
@@ -135,6 +224,7 @@ class ContactModal(discord.ui.Modal, title="Contact Form"):
         )
         self.add_item(self.inquiry)
 
+    @timed("contact_form")
     async def on_submit(self, interaction: discord.Interaction):
         try:
             forum = interaction.client.get_channel(FORUM_CHANNEL_ID)
@@ -154,7 +244,7 @@ class ContactModal(discord.ui.Modal, title="Contact Form"):
                 reason=f"Contact ticket created by {self.user}",
             )
 
-            self.cog.active_tickets[self.user.id] = thread.id
+            self.cog.open_ticket(self.user.id, thread.id)
 
             now = datetime.now().strftime("%m/%d/%Y %H:%M")
             embed_staff = discord.Embed(
@@ -167,8 +257,7 @@ class ContactModal(discord.ui.Modal, title="Contact Form"):
                 color=0xE7BB19,
             )
 
-            view = TicketControls(self.cog, self.user)
-            await starter_msg.edit(content=role_mention, embed=embed_staff, view=view)
+            await starter_msg.edit(content=role_mention, embed=embed_staff, view=self.cog.ticket_controls)
 
             # DM confirmation for user
             embed_dm = discord.Embed(
@@ -182,10 +271,7 @@ class ContactModal(discord.ui.Modal, title="Contact Form"):
             embed_dm.set_thumbnail(
                 url="https://media.discordapp.net/attachments/1400897643772907640/1424180413076606977/Untitled_design_4.png?ex=69107e9e&is=690f2d1e&hm=74989a85019ed50ac5814b2ce101c204b3f26cfe13a3d62351af0d34c5e76cad&=&format=webp&quality=lossless"
             )
-            try:
-                await self.user.send(embed=embed_dm)
-            except discord.Forbidden:
-                pass
+            interaction.client.dm_queue.enqueue(self.user, embed=embed_dm)
 
             await interaction.response.send_message(
                 "Your contact has been submitted successfully.", ephemeral=True
@@ -203,38 +289,51 @@ class ContactModal(discord.ui.Modal, title="Contact Form"):
 # TICKET CONTROLS
 # ------------------------------
 class TicketControls(discord.ui.View):
-    def __init__(self, cog: ContactSystem, opener: discord.User):
+    """Persistent controls shared by every ticket post; the opener is looked up from the thread."""
+
+    def __init__(self, cog: ContactSystem):
         super().__init__(timeout=None)
         self.cog = cog
-        self.opener = opener
 
-    @discord.ui.button(label="Close", style=discord.ButtonStyle.danger)
+    async def opener_for(self, interaction: discord.Interaction) -> int | None:
+        opener_id = self.cog.tickets.user_for(interaction.channel.id)
+        if opener_id is None:
+            await interaction.response.send_message("This ticket is already closed.", ephemeral=True)
+        return opener_id
+
+    @discord.ui.button(label="Close", style=discord.ButtonStyle.danger, custom_id="contact_ticket:close")
+    @timed("ticket_close")
     async def close(self, interaction: discord.Interaction, button: discord.ui.Button):
+        opener_id = await self.opener_for(interaction)
+        if opener_id is None:
+            return
+
         thread = interaction.channel
         embed_thread = discord.Embed(description="This ticket has been closed.", color=0x8A8A8A)
         msg = await thread.send(content="\u200b", embed=embed_thread)
         self.cog.ignore_messages.add(msg.id)
 
-        try:
-            await self.opener.send(embed=embed_thread)
-        except discord.Forbidden:
-            pass
+        interaction.client.dm_queue.enqueue(opener_id, embed=embed_thread)
 
-        self.cog.active_tickets.pop(self.opener.id, None)
-        self.stop()
+        self.cog.close_ticket(opener_id)
 
-    @discord.ui.button(label="Elevate Contact", style=discord.ButtonStyle.secondary)
+    @discord.ui.button(label="Elevate Contact", style=discord.ButtonStyle.secondary, custom_id="contact_ticket:elevate")
+    @timed("ticket_elevate")
     async def elevate(self, interaction: discord.Interaction, button: discord.ui.Button):
+        opener_id = await self.opener_for(interaction)
+        if opener_id is None:
+            return
+
         await interaction.response.send_message(
-            ephemeral=True, view=ElevateDropdown(self.cog, self.opener)
+            ephemeral=True, view=ElevateDropdown(self.cog, opener_id)
         )
 
 
 class ElevateDropdown(discord.ui.View):
-    def __init__(self, cog: ContactSystem, opener: discord.User):
+    def __init__(self, cog: ContactSystem, opener_id: int):
         super().__init__(timeout=60)
         self.cog = cog
-        self.opener = opener
+        self.opener_id = opener_id
 
         select = discord.ui.Select(
             placeholder="Select elevation level",
@@ -247,6 +346,7 @@ class ElevateDropdown(discord.ui.View):
         select.callback = self.select_callback
         self.add_item(select)
 
+    @timed("ticket_elevate_select")
     async def select_callback(self, interaction: discord.Interaction):
         choice = interaction.data["values"][0]
 
@@ -264,10 +364,8 @@ class ElevateDropdown(discord.ui.View):
         self.cog.ignore_messages.add(msg.id)
 
         embed_user = discord.Embed(description=f"Your ticket has been elevated to {text_name}.", color=0x8A8A8A)
-        try:
-            await self.opener.send(embed=embed_user)
-        except discord.Forbidden:
-            pass
+        interaction.client.dm_queue.enqueue(self.opener_id, embed=embed_user)
+        self.cog.elevate_ticket(self.opener_id, text_name)
 
         await interaction.response.edit_message(view=None)
 
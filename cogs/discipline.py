@@ -1,18 +1,32 @@
 # cogs/discipline.py
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
-import json, asyncio
+import asyncio
+import functools
+import itertools
+import json
+import re
+import time
+from datetime import datetime, timezone
 from pathlib import Path
 
+from utils.instrumentation import stage, timed
+from utils.storage import Storage
+
 # CONFIG
 LOG_CHANNEL_ID = 1416895577156747424
 TARGET_GUILD_ID = 1416869400748757124
-AUTH_FILE = Path("authorization_logs.json")
+AUTH_REFRESH_SECONDS = 30  # how often to look for authorization edits made outside the bot
+BULK_MAX_OFFICERS = 50  # officers one bulk action may target
+BULK_WORKERS = 4  # officers processed at once; DMs and log posts are further paced by their queues
+BULK_PROGRESS_SECONDS = 2.0  # how often the progress message is refreshed
+HISTORY_PAGE_SIZE = 5  # records per page of /discipline history
 
 SUSPENSION_ROLE_ID = 1416876088331604048  # replace with actual
-DEMOTION_REMOVE_FILE = Path("demotion_remove_roles.json")
-DEMOTION_ASSIGN_FILE = Path("demotion_assign_roles.json")
+SUSPENSION_TIMER = "suspension_end"  # durable timer kind that lifts a suspension
+DEMOTION_REMOVE_FILE = Path("demotion_remove_roles.json")  # [role_id, ...] taken off on any demotion
+DEMOTION_ASSIGN_FILE = Path("demotion_assign_roles.json")  # {"rank": role_id} given for the new rank
 
 DISCIPLINE_LEVELS = {
     "Written Warning": 1,
@@ -26,17 +40,99 @@ COLOR = discord.Color(int("E7BB19", 16))
 LOGO_URL = "https://media.discordapp.net/attachments/1400897643772907640/1424180413076606977/Untitled_design_4.png?ex=69107e9e&is=690f2d1e&hm=74989a85019ed50ac5814b2ce101c204b3f26cfe13a3d62351af0d34c5e76cad&=&format=webp&quality=lossless"
 
 # ---------------- Authorization ----------------
+class AuthorizationIndex:
+    """In-memory access levels keyed by user id, loaded once from the authorizations table.
+
+    Only accepted authorizations are indexed. The index is updated directly by
+    /authorization and reloaded when the database is changed from outside the bot.
+    """
+
+    def __init__(self):
+        self.levels: dict[int, int] = {}
+        self.version: int | None = None
+
+    def load(self, storage: Storage):
+        self.version = storage.data_version()
+        self.levels = {
+            entry["user_id"]: int(entry["access_level"])
+            for entry in storage.load_authorizations()
+            if entry["action"] == "Accepted"
+        }
+
+    def refresh(self, storage: Storage):
+        if storage.data_version() != self.version:
+            self.load(storage)
+
+    def set(self, user_id: int, action: str, access_level: int):
+        if action == "Accepted":
+            self.levels[user_id] = access_level
+        else:
+            self.levels.pop(user_id, None)
+
+
+auth_index = AuthorizationIndex()
+
+
+# ---------------- Demotion roles ----------------
+class DemotionConfig:
+    """Demotion role mappings read from DEMOTION_REMOVE_FILE and DEMOTION_ASSIGN_FILE.
+
+    The files stay hand-edited config. They are re-read only when their
+    modification time changes, so an edit applies to the next demotion.
+    """
+
+    def __init__(self, remove_file: Path, assign_file: Path):
+        self.remove_file = remove_file
+        self.assign_file = assign_file
+        self.remove_ids: set[int] = set()
+        self.assign_ids: dict[str, int] = {}
+        self._mtimes: tuple[float | None, float | None] | None = None
+
+    @staticmethod
+    def _mtime(path: Path) -> float | None:
+        try:
+            return path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _read(path: Path, default):
+        try:
+            text = path.read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return default
+        return json.loads(text) if text else default
+
+    def load(self) -> tuple[set[int], dict[str, int]]:
+        mtimes = (self._mtime(self.remove_file), self._mtime(self.assign_file))
+        if mtimes != self._mtimes:
+            try:
+                remove_ids = {int(role_id) for role_id in self._read(self.remove_file, [])}
+                assign_ids = {rank: int(role_id) for rank, role_id in self._read(self.assign_file, {}).items()}
+            except (ValueError, TypeError, AttributeError) as e:
+                # Surfaced to the issuer; the next demotion reads the files again
+                raise LookupError(f"the demotion role files could not be read ({e})") from e
+            self.remove_ids, self.assign_ids, self._mtimes = remove_ids, assign_ids, mtimes
+        return self.remove_ids, self.assign_ids
+
+
+demotion_config = DemotionConfig(DEMOTION_REMOVE_FILE, DEMOTION_ASSIGN_FILE)
+
+
+# Keys for queued history inserts; each record is its own write
+history_ids = itertools.count()
+
+
 def get_user_level(user_id: int) -> int | None:
-    if not AUTH_FILE.exists():
-        return None
-    try:
-        with open(AUTH_FILE, "r") as f:
-            data = json.load(f)
-    except json.JSONDecodeError:
-        return None
-    for entry in data:
-        if entry.get("id") == user_id and entry.get("action") == "Accepted":
-            return int(entry.get("access_level", 0))
+    return auth_index.levels.get(user_id)
+
+
+def authorization_error(user_id: int, discipline_type: str) -> str | None:
+    user_level = get_user_level(user_id)
+    if user_level is None:
+        return "You are not authorized to use this command."
+    if user_level < DISCIPLINE_LEVELS[discipline_type]:
+        return f"You do not have the required authorization level to issue a {discipline_type}."
     return None
 
 
@@ -45,7 +141,35 @@ class Discipline(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    @app_commands.command(name="discipline", description="Issue a disciplinary action")
+    async def cog_load(self):
+        await self.bot.persistence.run(auth_index.load, self.bot.storage)
+        self.refresh_authorizations.start()
+        self.bot.timers.register(SUSPENSION_TIMER, self.end_suspension)
+        self.bot.metrics.gauge("authorizations", "Users with a discipline authorization.", lambda: len(auth_index.levels))
+
+    async def end_suspension(self, key: str, payload: dict):
+        guild = self.bot.get_guild(payload["guild_id"])
+        if not guild:
+            return
+        role = guild.get_role(payload["role_id"])
+        try:
+            member = guild.get_member(payload["user_id"]) or await guild.fetch_member(payload["user_id"])
+        except discord.NotFound:
+            return  # left the server while suspended
+        if role and role in member.roles:
+            await member.remove_roles(role, reason="Suspension expired")
+
+    def cog_unload(self):
+        self.refresh_authorizations.cancel()
+
+    @tasks.loop(seconds=AUTH_REFRESH_SECONDS)
+    async def refresh_authorizations(self):
+        # Picks up edits made with other tools; permission checks themselves never touch the disk
+        await self.bot.persistence.run(auth_index.refresh, self.bot.storage)
+
+    discipline = app_commands.Group(name="discipline", description="Issue disciplinary actions")
+
+    @discipline.command(name="issue", description="Issue a disciplinary action")
     @app_commands.describe(
         officer="Select the officer to discipline",
         type="Select the type of disciplinary action"
@@ -57,22 +181,16 @@ class Discipline(commands.Cog):
         app_commands.Choice(name="Termination", value="Termination"),
         app_commands.Choice(name="Blacklist", value="Blacklist"),
     ])
-    async def discipline(
+    async def issue(
         self,
         interaction: discord.Interaction,
         officer: discord.Member,
         type: app_commands.Choice[str]
     ):
-        user_level = get_user_level(interaction.user.id)
-        if user_level is None:
-            return await interaction.response.send_message("You are not authorized to use this command.", ephemeral=True)
-
         discipline_type = type.value
-        if user_level < DISCIPLINE_LEVELS[discipline_type]:
-            return await interaction.response.send_message(
-                f"You do not have the required authorization level to issue a {discipline_type}.",
-                ephemeral=True
-            )
+        error = authorization_error(interaction.user.id, discipline_type)
+        if error:
+            return await interaction.response.send_message(error, ephemeral=True)
 
         # Select modal
         if discipline_type in ["Written Warning", "Termination", "Blacklist"]:
@@ -84,6 +202,155 @@ class Discipline(commands.Cog):
 
         await interaction.response.send_modal(modal)
 
+    @discipline.command(name="bulk", description="Issue the same disciplinary action to several officers")
+    @app_commands.describe(
+        type="Select the type of disciplinary action",
+        officers="Mentions or IDs of the officers, separated by spaces or commas",
+        role="Discipline every member of this role"
+    )
+    @app_commands.choices(type=[
+        app_commands.Choice(name="Written Warning", value="Written Warning"),
+        app_commands.Choice(name="Suspension", value="Suspension"),
+        app_commands.Choice(name="Demotion", value="Demotion"),
+        app_commands.Choice(name="Termination", value="Termination"),
+        app_commands.Choice(name="Blacklist", value="Blacklist"),
+    ])
+    async def bulk(
+        self,
+        interaction: discord.Interaction,
+        type: app_commands.Choice[str],
+        officers: str = None,
+        role: discord.Role = None
+    ):
+        # Authorization is checked once for the whole batch
+        error = authorization_error(interaction.user.id, type.value)
+        if error:
+            return await interaction.response.send_message(error, ephemeral=True)
+
+        targets: dict[int, discord.abc.User] = {}
+        missing = []
+        for user_id in dict.fromkeys(int(match) for match in re.findall(r"\d{15,20}", officers or "")):
+            member = interaction.guild.get_member(user_id) if interaction.guild else None
+            if member:
+                targets[user_id] = member
+            else:
+                missing.append(user_id)
+        if role:
+            for member in role.members:
+                targets.setdefault(member.id, member)
+        targets = {user_id: member for user_id, member in targets.items() if not member.bot}
+
+        if not targets:
+            return await interaction.response.send_message("No officers found to discipline.", ephemeral=True)
+        if len(targets) > BULK_MAX_OFFICERS:
+            return await interaction.response.send_message(
+                f"A bulk action can target at most {BULK_MAX_OFFICERS} officers ({len(targets)} selected).",
+                ephemeral=True
+            )
+
+        await interaction.response.send_modal(BulkDisciplineModal(type.value, list(targets.values()), missing))
+
+    @discipline.command(name="history", description="Look up past disciplinary actions")
+    @app_commands.describe(
+        officer="Only actions against this officer",
+        issuer="Only actions issued by this supervisor",
+        type="Only this type of action",
+        days="Only actions from the last N days"
+    )
+    @app_commands.choices(type=[
+        app_commands.Choice(name="Written Warning", value="Written Warning"),
+        app_commands.Choice(name="Suspension", value="Suspension"),
+        app_commands.Choice(name="Demotion", value="Demotion"),
+        app_commands.Choice(name="Termination", value="Termination"),
+        app_commands.Choice(name="Blacklist", value="Blacklist"),
+    ])
+    async def history(
+        self,
+        interaction: discord.Interaction,
+        officer: discord.User = None,
+        issuer: discord.User = None,
+        type: app_commands.Choice[str] = None,
+        days: app_commands.Range[int, 1, 3650] = None
+    ):
+        if get_user_level(interaction.user.id) is None:
+            return await interaction.response.send_message("You are not authorized to use this command.", ephemeral=True)
+
+        filters = {
+            "officer_id": officer.id if officer else None,
+            "issuer_id": issuer.id if issuer else None,
+            "action": type.value if type else None,
+            "since": time.time() - days * 86400 if days else None,
+        }
+        view = DisciplineHistoryView(interaction.user.id, filters)
+        await view.load(interaction.client)
+        await interaction.response.send_message(
+            embed=view.render(), view=view if view.pages > 1 else discord.utils.MISSING, ephemeral=True
+        )
+
+
+class DisciplineHistoryView(discord.ui.View):
+    """Pages through discipline history; each page is one indexed query."""
+
+    def __init__(self, viewer_id: int, filters: dict):
+        super().__init__(timeout=600)
+        self.viewer_id = viewer_id
+        self.filters = filters
+        self.page = 0
+        self.total = 0
+        self.records = []
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-self.total // HISTORY_PAGE_SIZE))
+
+    async def load(self, client: discord.Client):
+        self.total, self.records = await client.persistence.run(
+            functools.partial(
+                client.storage.discipline_history,
+                **self.filters,
+                limit=HISTORY_PAGE_SIZE,
+                offset=self.page * HISTORY_PAGE_SIZE,
+            )
+        )
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.pages - 1
+
+    def render(self) -> discord.Embed:
+        embed = discord.Embed(title="Discipline History", color=COLOR)
+        for record in self.records:
+            issued = datetime.fromtimestamp(record["created"], timezone.utc)
+            embed.add_field(
+                name=f"{record['punishment'][:200]} · {issued.strftime('%m/%d/%Y')}",
+                value=(
+                    f"- **Officer:** <@{record['officer_id']}>\n"
+                    f"- **Supervisor:** <@{record['issuer_id']}>\n"
+                    f"- **Reason:** {record['reason'][:300]}\n"
+                    f"- **Evidence:** {record['evidence'][:300]}"
+                ),
+                inline=False
+            )
+        if not self.records:
+            embed.description = "No disciplinary actions match these filters."
+        embed.set_footer(text=f"Page {self.page + 1}/{self.pages} · {self.total} records")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.viewer_id
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary)
+    @timed("discipline_history_page")
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page -= 1
+        await self.load(interaction.client)
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
+    @timed("discipline_history_page")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page += 1
+        await self.load(interaction.client)
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
 
 # ----------------- MODALS -----------------
 class SimpleDisciplineModal(discord.ui.Modal, title="Disciplinary Action"):
@@ -99,6 +366,7 @@ class SimpleDisciplineModal(discord.ui.Modal, title="Disciplinary Action"):
         self.add_item(self.reason)
         self.add_item(self.evidence)
 
+    @timed("discipline_form")
     async def on_submit(self, interaction: discord.Interaction):
         await handle_discipline(
             interaction,
@@ -125,6 +393,7 @@ class SuspensionModal(discord.ui.Modal, title="Suspension Form"):
         self.add_item(self.evidence)
         self.add_item(self.length)
 
+    @timed("discipline_form")
     async def on_submit(self, interaction: discord.Interaction):
         await handle_discipline(
             interaction,
@@ -151,6 +420,7 @@ class DemotionModal(discord.ui.Modal, title="Demotion Form"):
         self.add_item(self.evidence)
         self.add_item(self.new_rank)
 
+    @timed("discipline_form")
     async def on_submit(self, interaction: discord.Interaction):
         await handle_discipline(
             interaction,
@@ -163,7 +433,50 @@ class DemotionModal(discord.ui.Modal, title="Demotion Form"):
         )
 
 
+class BulkDisciplineModal(discord.ui.Modal, title="Bulk Disciplinary Action"):
+    def __init__(self, action_type: str, officers: list, missing: list):
+        super().__init__()
+        self.action_type = action_type
+        self.officers = officers
+        self.missing = missing
+
+        self.reason = discord.ui.TextInput(label="Reason", style=discord.TextStyle.paragraph)
+        self.evidence = discord.ui.TextInput(label="Evidence", style=discord.TextStyle.paragraph)
+        self.add_item(self.reason)
+        self.add_item(self.evidence)
+
+        self.length = self.new_rank = None
+        if action_type == "Suspension":
+            self.length = discord.ui.TextInput(label="Length", placeholder="1d, 3d, 7d")
+            self.add_item(self.length)
+        elif action_type == "Demotion":
+            self.new_rank = discord.ui.TextInput(label="New Rank", placeholder="Enter new rank name")
+            self.add_item(self.new_rank)
+
+    @timed("discipline_bulk_form")
+    async def on_submit(self, interaction: discord.Interaction):
+        await handle_bulk_discipline(
+            interaction,
+            self.officers,
+            self.missing,
+            self.action_type,
+            self.reason.value,
+            self.evidence.value,
+            length=self.length.value if self.length else None,
+            new_rank=self.new_rank.value if self.new_rank else None,
+        )
+
+
 # ----------------- HANDLER -----------------
+def describe_punishment(action_type, length=None, new_rank=None):
+    punishment = action_type
+    if action_type == "Suspension" and length:
+        punishment += f" ({length})"
+    if action_type == "Demotion" and new_rank:
+        punishment += f" → {new_rank}"
+    return punishment
+
+
 async def handle_discipline(
     interaction,
     officer,
@@ -174,17 +487,26 @@ async def handle_discipline(
     length=None,
     new_rank=None
 ):
-    punishment = action_type
-    if action_type == "Suspension" and length:
-        punishment += f" ({length})"
-    if action_type == "Demotion" and new_rank:
-        punishment += f" → {new_rank}"
-
+    punishment = describe_punishment(action_type, length, new_rank)
     await interaction.response.send_message(
         f"Disciplinary action issued against {officer.mention}: **{punishment}**",
         ephemeral=True
     )
 
+    problems = await apply_discipline(interaction, officer, action_type, reason, evidence, length=length, new_rank=new_rank)
+    if problems:
+        await interaction.followup.send(
+            f"Some steps did not complete for {officer.mention}:\n" + "\n".join(f"- {problem}" for problem in problems),
+            ephemeral=True
+        )
+
+
+async def apply_discipline(interaction, officer, action_type, reason, evidence, length=None, new_rank=None) -> list:
+    """Send the DM, post the log and apply the member action; returns one line per failed step."""
+    client = interaction.client
+    punishment = describe_punishment(action_type, length, new_rank)
+    problems = []
+
     # DM Embed
     embed_dm = discord.Embed(
         title="Senora Valley Police Department | Disciplinary Action",
@@ -199,13 +521,17 @@ async def handle_discipline(
     )
     embed_dm.set_thumbnail(url=LOGO_URL)
 
-    try:
-        await officer.send(embed=embed_dm)
-    except:
-        pass
+    # Every issued action is recorded, whatever happens to the steps below
+    client.persistence.write(
+        ("discipline_history", next(history_ids)),
+        client.storage.add_discipline_record,
+        officer.id, interaction.user.id, action_type, punishment, reason, evidence, time.time(),
+    )
+
+    delivery = client.dm_queue.enqueue(officer, embed=embed_dm)
 
     # Log channel
-    log_channel = interaction.client.get_channel(LOG_CHANNEL_ID)
+    log_channel = client.get_channel(LOG_CHANNEL_ID)
     if log_channel:
         embed_log = discord.Embed(
             title="Discipline Log",
@@ -220,61 +546,146 @@ async def handle_discipline(
         )
         embed_log.set_thumbnail(url=LOGO_URL)
         embed_log.set_footer(text=f"Issued on {discord.utils.format_dt(discord.utils.utcnow(), style='F')}")
-        await log_channel.send(embed=embed_log)
+        client.log_sink.post(LOG_CHANNEL_ID, embed_log)
+    else:
+        problems.append("Log: the discipline log channel was not found")
+
+    async def member_step():
+        if action_type in ("Termination", "Blacklist"):
+            await delivery  # once they are removed the DM can no longer reach them
+        await apply_member_action(interaction, officer, action_type, reason, length, new_rank)
+
+    with stage(interaction, "DM + member action"):
+        delivered, action_result = await asyncio.gather(delivery, member_step(), return_exceptions=True)
+    if not delivered or isinstance(delivered, Exception):
+        problems.append(f"DM: could not be delivered to {officer.mention}")
+    if isinstance(action_result, Exception):
+        problems.append(f"{action_type}: {action_result}")
+    return problems
+
+
+async def handle_bulk_discipline(interaction, officers, missing, action_type, reason, evidence, length=None, new_rank=None):
+    punishment = describe_punishment(action_type, length, new_rank)
+    total = len(officers)
+    done = 0
+    await interaction.response.send_message(
+        f"Issuing **{punishment}** to {total} officers… 0/{total} done.",
+        ephemeral=True
+    )
+
+    # A few officers at a time; each one's DM and log post still go through the shared queues
+    limiter = asyncio.Semaphore(BULK_WORKERS)
+
+    async def process(officer):
+        nonlocal done
+        async with limiter:
+            try:
+                problems = await apply_discipline(
+                    interaction, officer, action_type, reason, evidence, length=length, new_rank=new_rank
+                )
+            except Exception as e:
+                problems = [f"failed: {e}"]
+        done += 1
+        return officer, problems
+
+    async def report_progress():
+        while True:
+            await asyncio.sleep(BULK_PROGRESS_SECONDS)
+            try:
+                await interaction.edit_original_response(
+                    content=f"Issuing **{punishment}** to {total} officers… {done}/{total} done."
+                )
+            except discord.HTTPException:
+                pass
+
+    progress = asyncio.create_task(report_progress())
+    try:
+        results = await asyncio.gather(*(process(officer) for officer in officers))
+    finally:
+        progress.cancel()
+
+    lines = []
+    for officer, problems in results:
+        if problems:
+            lines.append(f"⚠️ {officer.mention}: " + "; ".join(problems))
+        else:
+            lines.append(f"✅ {officer.mention}")
+    lines += [f"❌ <@{user_id}>: not found in this server" for user_id in missing]
+    succeeded = sum(1 for _, problems in results if not problems)
+
+    # Summary embeds stay under Discord's description limit; overflow goes to followups
+    embeds, chunk = [], ""
+    for line in lines:
+        if len(chunk) + len(line) + 1 > 4000:
+            embeds.append(chunk)
+            chunk = ""
+        chunk += line + "\n"
+    embeds.append(chunk)
+    embeds = [discord.Embed(title="Bulk Discipline Results", description=text, color=COLOR) for text in embeds]
+
+    content = f"**{punishment}** issued: {succeeded}/{total + len(missing)} officers completed without problems."
+    try:
+        await interaction.edit_original_response(content=content, embed=embeds[0])
+    except discord.HTTPException:
+        await interaction.followup.send(content, embed=embeds[0], ephemeral=True)
+    for embed in embeds[1:]:
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
-    guild = interaction.client.get_guild(TARGET_GUILD_ID)
-    if not guild:
+
+async def apply_member_action(interaction, officer, action_type, reason, length=None, new_rank=None):
+    """Kick, ban or change roles as the action requires, with at most one role edit per member."""
+    if action_type == "Written Warning":
         return
 
-    member = guild.get_member(officer.id)
+    client = interaction.client
+    guild = client.get_guild(TARGET_GUILD_ID)
+    member = guild.get_member(officer.id) if guild else None
     if not member:
-        return
+        raise LookupError("the officer is not in the department server")
 
     # Special Actions
     if action_type == "Termination":
-        await member.kick(reason=reason)
+        with stage(interaction, "kick"):
+            await member.kick(reason=reason)
     elif action_type == "Blacklist":
-        await member.ban(reason=reason)
+        with stage(interaction, "ban"):
+            await member.ban(reason=reason)
     elif action_type == "Suspension" and length:
         suspension_role = guild.get_role(SUSPENSION_ROLE_ID)
-        if suspension_role:
+        if not suspension_role:
+            raise LookupError("the suspension role was not found")
+        with stage(interaction, "add role"):
             await member.add_roles(suspension_role, reason=f"Suspended for {length}")
 
-            dur_map = {"1d": 86400, "3d": 86400 * 3, "7d": 86400 * 7}
-            duration_seconds = dur_map.get(length.lower(), 86400)
+        dur_map = {"1d": 86400, "3d": 86400 * 3, "7d": 86400 * 7}
+        duration_seconds = dur_map.get(length.lower(), 86400)
 
-            async def remove_suspension():
-                await asyncio.sleep(duration_seconds)
-                try:
-                    await member.remove_roles(suspension_role, reason="Suspension expired")
-                except:
-                    pass
-
-            asyncio.create_task(remove_suspension())
+        # Persisted, so the role still comes off after a restart
+        client.timers.schedule(
+            SUSPENSION_TIMER,
+            str(member.id),
+            time.time() + duration_seconds,
+            {"guild_id": guild.id, "user_id": member.id, "role_id": suspension_role.id},
+        )
 
     elif action_type == "Demotion" and new_rank:
-        if DEMOTION_REMOVE_FILE.exists():
-            try:
-                with open(DEMOTION_REMOVE_FILE, "r") as f:
-                    remove_roles = json.load(f)
-                for role_id in remove_roles:
-                    role = guild.get_role(int(role_id))
-                    if role in member.roles:
-                        await member.remove_roles(role, reason="Demotion role removal")
-            except:
-                pass
+        remove_ids, assign_ids = await client.persistence.run(demotion_config.load)
+        assign_id = assign_ids.get(new_rank)
+        assign_role = guild.get_role(assign_id) if assign_id else None
+
+        # The whole change is one role list, sent in a single member edit
+        current = [role for role in member.roles if not role.is_default()]
+        target = [role for role in current if role.id not in remove_ids]
+        if assign_role and assign_role not in target:
+            target.append(assign_role)
+        if set(target) != set(current):
+            with stage(interaction, "edit roles"):
+                await member.edit(roles=target, reason=f"Demoted to {new_rank}")
+
+        if not assign_role:
+            raise LookupError(f"no role is configured for rank {new_rank!r} in {DEMOTION_ASSIGN_FILE}")
+
 
-        if DEMOTION_ASSIGN_FILE.exists():
-            try:
-                with open(DEMOTION_ASSIGN_FILE, "r") as f:
-                    assign_roles = json.load(f)
-                role_id = assign_roles.get(new_rank)
-                if role_id:
-                    role = guild.get_role(int(role_id))
-                    if role:
-                        await member.add_roles(role, reason="Demotion role assignment")
-            except:
-                pass
 # ----------------- Authorization Command -----------------
 class Authorization(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -302,29 +713,18 @@ class Authorization(commands.Cog):
                 "Access level must be between 1 and 4.", ephemeral=True
             )
 
-        log_entry = {
-            "id": user.id,
-            "action": action.value,
-            "access_level": access_level,
-            "authorized_by": interaction.user.id,
-            "timestamp": str(discord.utils.utcnow())
-        }
-
-        # Load existing data
-        data = []
-        if AUTH_FILE.exists():
-            try:
-                with open(AUTH_FILE, "r") as f:
-                    data = json.load(f)
-            except json.JSONDecodeError:
-                data = []
-
-        # Remove previous authorizations for this user
-        data = [entry for entry in data if entry.get("id") != user.id]
-        data.append(log_entry)
-
-        with open(AUTH_FILE, "w") as f:
-            json.dump(data, f, indent=4)
+        # Replaces any previous authorization for this user; the index updates immediately
+        # and the row is written off the event loop
+        auth_index.set(user.id, action.value, access_level)
+        self.bot.persistence.write(
+            ("authorization", user.id),
+            self.bot.storage.save_authorization,
+            user.id,
+            action.value,
+            access_level,
+            interaction.user.id,
+            str(discord.utils.utcnow())
+        )
 
         # Confirmation embed
         embed = discord.Embed(
@@ -345,7 +745,7 @@ class Authorization(commands.Cog):
         # Log it publicly
         log_channel = interaction.client.get_channel(LOG_CHANNEL_ID)
         if log_channel:
-            await log_channel.send(embed=embed)
+            self.bot.log_sink.post(LOG_CHANNEL_ID, embed)
 
 
 async def setup(bot: commands.Bot):
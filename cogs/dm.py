@@ -4,6 +4,17 @@ from discord.ext import commands
 from discord import app_commands, ui
 from datetime import datetime
 
+from utils.instrumentation import timed
+
+async def report_delivery(interaction: discord.Interaction, delivery, sent_text: str, failed_text: str):
+    # The DM queue delivers in the background; update the ephemeral reply once it has an outcome
+    message = await delivery
+    try:
+        await interaction.edit_original_response(content=sent_text if message else failed_text)
+    except discord.HTTPException:
+        pass
+
+
 class DMModal(ui.Modal, title="Send a DM"):
     def __init__(self, officer: discord.Member):
         super().__init__(timeout=None)
@@ -17,6 +28,7 @@ class DMModal(ui.Modal, title="Send a DM"):
         )
         self.add_item(self.statement)
 
+    @timed("dm_form")
     async def on_submit(self, interaction: discord.Interaction):
         embed = discord.Embed(
             title="We'd like to get in contact,",
@@ -40,20 +52,20 @@ class DMConfirmView(ui.View):
         self.embed = embed
 
     @ui.button(label="Send", style=discord.ButtonStyle.secondary)
+    @timed("dm_send")
     async def send_button(self, interaction: discord.Interaction, button: ui.Button):
-        try:
-            await self.officer.send(embed=self.embed)
-            await interaction.response.edit_message(
-                content=f"Message successfully sent to {self.officer.mention}.",
-                embed=None,
-                view=None
-            )
-        except discord.Forbidden:
-            await interaction.response.edit_message(
-                content=f"Could not DM {self.officer.mention} (their DMs may be closed).",
-                embed=None,
-                view=None
-            )
+        delivery = interaction.client.dm_queue.enqueue(self.officer, embed=self.embed)
+        await interaction.response.edit_message(
+            content=f"Message queued for {self.officer.mention}.",
+            embed=None,
+            view=None
+        )
+        await report_delivery(
+            interaction,
+            delivery,
+            f"Message successfully sent to {self.officer.mention}.",
+            f"Could not DM {self.officer.mention} (their DMs may be closed)."
+        )
 
 
 class DMTools(commands.Cog):
@@ -89,16 +101,16 @@ class DMTools(commands.Cog):
             url="https://media.discordapp.net/attachments/1400897643772907640/1424180413076606977/Untitled_design_4.png?ex=69107e9e&is=690f2d1e&hm=74989a85019ed50ac5814b2ce101c204b3f26cfe13a3d62351af0d34c5e76cad&=&format=webp&quality=lossless"
         )
 
-        try:
-            await officer.send(embed=embed)
-            await interaction.response.send_message(
-                f"Sent hire message to {officer.mention}.", ephemeral=True
-            )
-        except discord.Forbidden:
-            await interaction.response.send_message(
-                f"Could not DM {officer.mention} (their DMs may be closed).",
-                ephemeral=True
-            )
+        delivery = interaction.client.dm_queue.enqueue(officer, embed=embed)
+        await interaction.response.send_message(
+            f"Hire message queued for {officer.mention}.", ephemeral=True
+        )
+        await report_delivery(
+            interaction,
+            delivery,
+            f"Sent hire message to {officer.mention}.",
+            f"Could not DM {officer.mention} (their DMs may be closed)."
+        )
 
 
 async def setup(bot):
@@ -34,7 +34,8 @@ class OfficerLoggerCog(commands.Cog):
             )
             embed.set_author(name="Senora Valley Police Department", icon_url=DEPARTMENT_LOGO)
             embed.set_thumbnail(url=DEPARTMENT_LOGO)
-            await channel.send(embed=embed)
+            # Batched: a burst of joins/leaves shares messages, up to 10 embeds each
+            self.bot.log_sink.post(CHANNEL_ID, embed)
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
@@ -53,7 +54,8 @@ class OfficerLoggerCog(commands.Cog):
             )
             embed.set_author(name="Senora Valley Police Department", icon_url=DEPARTMENT_LOGO)
             embed.set_thumbnail(url=DEPARTMENT_LOGO)
-            await channel.send(embed=embed)
+            # Batched: a burst of joins/leaves shares messages, up to 10 embeds each
+            self.bot.log_sink.post(CHANNEL_ID, embed)
 
 
 # ------------------------------
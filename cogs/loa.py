@@ -1,16 +1,26 @@
 # cogs/loa.py
+import asyncio
 import discord
 from discord import app_commands, ui
-from discord.ext import commands, tasks
-from datetime import datetime, timezone
-from pathlib import Path
-import json
+from discord.ext import commands
+from datetime import datetime, time, timedelta, timezone
 from typing import Optional
+from zoneinfo import ZoneInfo
+
+from utils.instrumentation import timed
+from utils.intervals import IntervalIndex
+from utils.messages import MessageHandle
+from utils.permissions import require
+from utils.scheduler import DeadlineScheduler
 
 # ---------------- CONFIG ----------------
 LOA_CHANNEL_ID = 1419090333068820631      # <-- set your LOA log channel ID
 APPROVER_ROLE_ID = 1416873675830857759    # <-- role allowed to approve/deny
 EMBED_COLOR = 0xE7BB19
+LOA_TIMEZONE = ZoneInfo("America/New_York")  # <-- department's local time; "today" and day boundaries follow it
+REVIEW_PAGE_SIZE = 25       # entries per page of /loa review (Discord's select option limit)
+REVIEW_CONCURRENCY = 5      # LOA post edits in flight at once during a bulk review
+ROSTER_PAGE_SIZE = 15       # officers per page of /loa roster
 THUMBNAIL_URL = "https://media.discordapp.net/attachments/1400897643772907640/1424180413076606977/Untitled_design_4.png?ex=69107e9e&is=690f2d1e&hm=74989a85019ed50ac5814b2ce101c204b3f26cfe13a3d62351af0d34c5e76cad&=&format=webp&quality=lossless"
 
 # Approve / Deny custom_id templates (you can replace these with your fixed IDs)
@@ -19,25 +29,87 @@ APPROVE_CUSTOM_ID = "loa_approve:{uid}"
 DENY_CUSTOM_ID = "loa_deny:{uid}"
 EXTEND_CUSTOM_ID = "loa_extend:{uid}"
 
-# Persist LOAs here
-STORE_FILE = Path("loa_store.json")
+# In-memory store loaded from the bot's SQLite storage when the cog loads; structure:
+# { "<user_id>": { "status": "Pending"/"Approved"/"Denied", "begin": "MM/DD/YYYY", "end": "MM/DD/YYYY",
+#                  "reason": "...", "message_id": <channel_message_id or null>, "channel_id": <channel id> } }
+loa_store: dict = {}
 
-# ---------------- Persistence helpers ----------------
-def load_store() -> dict:
-    if STORE_FILE.exists():
-        try:
-            return json.loads(STORE_FILE.read_text(encoding="utf-8"))
-        except Exception:
-            return {}
-    return {}
+# Expiry deadlines for every LOA in loa_store, keyed by user id
+expiry_schedule = DeadlineScheduler()
 
-def save_store(data: dict):
-    STORE_FILE.write_text(json.dumps(data, indent=2), encoding="utf-8")
+# Approved LOAs as [begin, end] day numbers (date.toordinal()), keyed by user id.
+# Both ends are inclusive: an LOA expires only once its end date is over (see schedule_expiry).
+roster_index = IntervalIndex()
 
-# In-memory store loaded from disk at start; structure:
-# { "<user_id>": { "status": "Pending"/"Approved"/"Denied", "begin": "MM/DD/YYYY", "end": "MM/DD/YYYY",
-#                  "reason": "...", "message_id": <channel_message_id or null>, "channel_id": <channel id> } }
-loa_store = load_store()
+# ---------------- Persistence helpers ----------------
+def persist_loa(client: discord.Client, uid: str):
+    # Queue a single-row write; repeated changes to the same LOA coalesce into one flush.
+    # Every LOA change comes through here, so the roster index follows along.
+    index_loa(uid)
+    if uid in loa_store:
+        client.persistence.write(("loa", uid), client.storage.save_loa, uid, dict(loa_store[uid]))
+    else:
+        client.persistence.write(("loa", uid), client.storage.delete_loa, uid)
+
+def index_loa(uid: str):
+    data = loa_store.get(uid)
+    begin_dt = parse_date(data["begin"]) if data and data["status"] == "Approved" else None
+    end_dt = parse_date(data["end"]) if begin_dt else None
+    if begin_dt and end_dt:
+        roster_index.add(uid, begin_dt.toordinal(), end_dt.toordinal())
+    else:
+        roster_index.remove(uid)
+
+def status_embed(uid: str) -> discord.Embed:
+    data = loa_store[uid]
+    embed = discord.Embed(
+        title="LOA Request",
+        description=(
+            f"**Officer:** <@{uid}>\n"
+            f"**Begins:** {data['begin']}\n"
+            f"**Ends:** {data['end']}\n"
+            f"**Reason:** {data['reason']}\n"
+            f"**Status:** {data['status']}"
+        ),
+        color=EMBED_COLOR
+    )
+    embed.set_thumbnail(url=THUMBNAIL_URL)
+    return embed
+
+async def edit_loa_message(client: discord.Client, uid: str, **fields):
+    # Edit the tracked LOA post by id (no fetch); forget it if someone deleted it
+    data = loa_store[uid]
+    handle = MessageHandle.from_ids(data.get("channel_id", LOA_CHANNEL_ID), data.get("message_id"))
+    if handle and not await handle.edit(client, **fields):
+        data["message_id"] = None
+        persist_loa(client, uid)
+
+async def review_loas(client: discord.Client, uids: list, status: str) -> list:
+    """Approve or deny many pending LOAs: one store commit, then concurrent post edits and DMs."""
+    updated = [uid for uid in uids if uid in loa_store and loa_store[uid]["status"] == "Pending"]
+    for uid in updated:
+        loa_store[uid]["status"] = status
+        persist_loa(client, uid)
+    await client.persistence.flush()  # the whole batch lands in a single transaction
+
+    dm_embed = discord.Embed(
+        description="Your LOA status has been updated. Use `/loa manage` to view the update.",
+        color=EMBED_COLOR
+    )
+    limiter = asyncio.Semaphore(REVIEW_CONCURRENCY)
+
+    async def publish(uid: str):
+        client.dm_queue.enqueue(int(uid), embed=dm_embed)
+        async with limiter:
+            if uid in loa_store:
+                await edit_loa_message(client, uid, embed=status_embed(uid), view=None)
+
+    await asyncio.gather(*(publish(uid) for uid in updated))
+    # Denied LOAs are cleared right away; schedule that only after their posts show the decision
+    for uid in updated:
+        if uid in loa_store:
+            schedule_expiry(uid)
+    return updated
 
 # ---------------- Date parsing ----------------
 DATE_FORMATS = ["%m/%d/%Y", "%Y-%m-%d", "%d-%m-%Y", "%m-%d-%Y"]
@@ -54,6 +126,26 @@ def parse_date(text: str) -> Optional[datetime]:
 def date_to_string(dt: datetime) -> str:
     return dt.strftime("%m/%d/%Y")
 
+def local_today() -> datetime:
+    # Same shape as parse_date() results: a calendar date at midnight, tagged UTC
+    return datetime.combine(datetime.now(LOA_TIMEZONE).date(), time.min, tzinfo=timezone.utc)
+
+def end_of_day(dt: datetime) -> float:
+    """Timestamp of local midnight after the calendar date ``dt``, when an LOA ending that day is over."""
+    return datetime.combine(dt.date() + timedelta(days=1), time.min, tzinfo=LOA_TIMEZONE).timestamp()
+
+def schedule_expiry(uid: str):
+    # Denied requests are cleared right away; everything else once its (inclusive) end date is over
+    data = loa_store[uid]
+    if data.get("status") == "Denied":
+        expiry_schedule.schedule(uid, datetime.now(timezone.utc).timestamp())
+        return
+    end_dt = parse_date(data["end"])
+    if end_dt:
+        expiry_schedule.schedule(uid, end_of_day(end_dt))
+    else:
+        expiry_schedule.cancel(uid)
+
 # ---------------- Modals ----------------
 class LOARequestModal(ui.Modal, title="LOA Request Form"):
     def __init__(self, requester: discord.Member):
@@ -68,6 +160,7 @@ class LOARequestModal(ui.Modal, title="LOA Request Form"):
         self.add_item(self.end)
         self.add_item(self.reason)
 
+    @timed("loa_request_form")
     async def on_submit(self, interaction: discord.Interaction):
         # Parse dates
         begin_dt = parse_date(self.begin.value)
@@ -88,7 +181,8 @@ class LOARequestModal(ui.Modal, title="LOA Request Form"):
             "message_id": None,
             "channel_id": LOA_CHANNEL_ID
         }
-        save_store(loa_store)
+        persist_loa(interaction.client, uid)
+        schedule_expiry(uid)
 
         # Build embed
         embed = discord.Embed(
@@ -112,7 +206,7 @@ class LOARequestModal(ui.Modal, title="LOA Request Form"):
 
         sent = await ch.send(embed=embed, view=view)
         loa_store[uid]["message_id"] = sent.id
-        save_store(loa_store)
+        persist_loa(interaction.client, uid)
 
         await interaction.response.send_message("Your LOA request has been submitted.", ephemeral=True)
 
@@ -124,6 +218,7 @@ class LOAExtendModal(ui.Modal, title="Extend LOA"):
         self.new_end = ui.TextInput(label="New End Date", placeholder="MM/DD/YYYY", required=True)
         self.add_item(self.new_end)
 
+    @timed("loa_extend_form")
     async def on_submit(self, interaction: discord.Interaction):
         uid = str(self.user_id)
         if uid not in loa_store:
@@ -135,30 +230,11 @@ class LOAExtendModal(ui.Modal, title="Extend LOA"):
 
         # update store
         loa_store[uid]["end"] = date_to_string(new_dt)
-        save_store(loa_store)
+        persist_loa(interaction.client, uid)
+        schedule_expiry(uid)
 
         # edit channel message if exists
-        msg_id = loa_store[uid].get("message_id")
-        ch_id = loa_store[uid].get("channel_id", LOA_CHANNEL_ID)
-        ch = interaction.client.get_channel(ch_id)
-        if ch and msg_id:
-            try:
-                msg = await ch.fetch_message(msg_id)
-                updated = discord.Embed(
-                    title="LOA Request",
-                    description=(
-                        f"**Officer:** <@{uid}>\n"
-                        f"**Begins:** {loa_store[uid]['begin']}\n"
-                        f"**Ends:** {loa_store[uid]['end']}\n"
-                        f"**Reason:** {loa_store[uid]['reason']}\n"
-                        f"**Status:** {loa_store[uid]['status']}"
-                    ),
-                    color=EMBED_COLOR
-                )
-                updated.set_thumbnail(url=THUMBNAIL_URL)
-                await msg.edit(embed=updated)
-            except Exception:
-                pass
+        await edit_loa_message(interaction.client, uid, embed=status_embed(uid))
 
         await interaction.response.send_message("Your LOA end date has been updated.", ephemeral=True)
 
@@ -176,7 +252,7 @@ class LOAModerationView(ui.View):
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         # only allow approvers to use the buttons
-        if any(r.id == APPROVER_ROLE_ID for r in interaction.user.roles):
+        if interaction.client.permissions.has_role(interaction.user, APPROVER_ROLE_ID):
             return True
         await interaction.response.send_message("You do not have permission to perform that action.", ephemeral=True)
         return False
@@ -190,6 +266,173 @@ class LOAModerationView(ui.View):
     async def _deny_stub(self, interaction: discord.Interaction, button: ui.Button):
         await interaction.response.defer()
 
+class LOAReviewView(ui.View):
+    """Pages through pending LOAs; the reviewer selects entries and approves or denies them together."""
+
+    def __init__(self, reviewer_id: int, guild: Optional[discord.Guild]):
+        super().__init__(timeout=600)
+        self.reviewer_id = reviewer_id
+        self.guild = guild
+        self.page = 0
+        self.selected: set = set()
+        self.pending: list = []
+
+        self.picker = ui.Select(placeholder="Select LOAs to review", min_values=0)
+        self.picker.callback = self.on_pick
+        self.add_item(self.picker)
+        self.refresh()
+
+    def refresh(self):
+        self.pending = sorted(
+            (uid for uid, data in loa_store.items() if data["status"] == "Pending"),
+            key=lambda uid: parse_date(loa_store[uid]["begin"]) or datetime.max.replace(tzinfo=timezone.utc),
+        )
+        self.selected &= set(self.pending)
+        pages = max(1, -(-len(self.pending) // REVIEW_PAGE_SIZE))
+        self.page = min(self.page, pages - 1)
+
+        page_uids = self.page_uids()
+        self.picker.options = [
+            discord.SelectOption(
+                label=self.officer_name(uid)[:100],
+                value=uid,
+                description=f"{loa_store[uid]['begin']} – {loa_store[uid]['end']}",
+                default=uid in self.selected,
+            )
+            for uid in page_uids
+        ] or [discord.SelectOption(label="No pending LOAs", value="none")]
+        self.picker.max_values = max(1, len(page_uids))
+        self.picker.disabled = not page_uids
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= pages - 1
+        self.approve.disabled = self.deny.disabled = not self.selected
+
+    def officer_name(self, uid: str) -> str:
+        member = self.guild.get_member(int(uid)) if self.guild else None
+        return member.display_name if member else f"Officer {uid}"
+
+    def page_uids(self) -> list:
+        start = self.page * REVIEW_PAGE_SIZE
+        return self.pending[start:start + REVIEW_PAGE_SIZE]
+
+    def render(self, note: str = "") -> discord.Embed:
+        lines = [
+            f"**<@{uid}>** — {loa_store[uid]['begin']} → {loa_store[uid]['end']}\n"
+            f"{loa_store[uid]['reason'][:80]}"
+            for uid in self.page_uids()
+        ]
+        pages = max(1, -(-len(self.pending) // REVIEW_PAGE_SIZE))
+        embed = discord.Embed(
+            title="Pending LOA Requests",
+            description="\n\n".join(lines) or "There are no pending LOAs.",
+            color=EMBED_COLOR
+        )
+        embed.set_footer(
+            text=f"Page {self.page + 1}/{pages} · {len(self.pending)} pending · {len(self.selected)} selected"
+        )
+        if note:
+            embed.add_field(name="Last action", value=note, inline=False)
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id == self.reviewer_id and interaction.client.permissions.has_role(
+            interaction.user, APPROVER_ROLE_ID
+        ):
+            return True
+        await interaction.response.send_message("You do not have permission to perform that action.", ephemeral=True)
+        return False
+
+    @timed("loa_review_pick")
+    async def on_pick(self, interaction: discord.Interaction):
+        self.selected -= set(self.page_uids())
+        self.selected |= {value for value in self.picker.values if value in loa_store}
+        self.refresh()
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @ui.button(label="Previous", style=discord.ButtonStyle.secondary, row=1)
+    @timed("loa_review_page")
+    async def previous_page(self, interaction: discord.Interaction, button: ui.Button):
+        self.page -= 1
+        self.refresh()
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @ui.button(label="Next", style=discord.ButtonStyle.secondary, row=1)
+    @timed("loa_review_page")
+    async def next_page(self, interaction: discord.Interaction, button: ui.Button):
+        self.page += 1
+        self.refresh()
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @ui.button(label="Approve selected", style=discord.ButtonStyle.success, row=2)
+    @timed("loa_review_approve")
+    async def approve(self, interaction: discord.Interaction, button: ui.Button):
+        await self.decide(interaction, "Approved")
+
+    @ui.button(label="Deny selected", style=discord.ButtonStyle.danger, row=2)
+    @timed("loa_review_deny")
+    async def deny(self, interaction: discord.Interaction, button: ui.Button):
+        await self.decide(interaction, "Denied")
+
+    async def decide(self, interaction: discord.Interaction, status: str):
+        chosen = sorted(self.selected)
+        await interaction.response.edit_message(
+            embed=self.render(f"Updating {len(chosen)} LOAs…"), view=None
+        )
+        updated = await review_loas(interaction.client, chosen, status)
+        self.selected.clear()
+        self.refresh()
+        skipped = len(chosen) - len(updated)
+        note = f"{status} {len(updated)} LOAs." + (f" {skipped} were no longer pending." if skipped else "")
+        await interaction.edit_original_response(embed=self.render(note), view=self if self.pending else None)
+
+class LOARosterView(ui.View):
+    """Pages through the officers returned by a roster query."""
+
+    def __init__(self, viewer_id: int, uids: list, title: str):
+        super().__init__(timeout=600)
+        self.viewer_id = viewer_id
+        self.uids = uids
+        self.title = title
+        self.page = 0
+        self.pages = max(1, -(-len(uids) // ROSTER_PAGE_SIZE))
+        self.update_buttons()
+
+    def update_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.pages - 1
+
+    def render(self) -> discord.Embed:
+        start = self.page * ROSTER_PAGE_SIZE
+        lines = [
+            f"<@{uid}> — {loa_store[uid]['begin']} → {loa_store[uid]['end']}"
+            if uid in loa_store else f"<@{uid}> — no longer on leave"
+            for uid in self.uids[start:start + ROSTER_PAGE_SIZE]
+        ]
+        embed = discord.Embed(
+            title=self.title,
+            description="\n".join(lines) or "Nobody is on approved leave in this period.",
+            color=EMBED_COLOR
+        )
+        embed.set_footer(text=f"Page {self.page + 1}/{self.pages} · {len(self.uids)} officers")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.viewer_id
+
+    @ui.button(label="Previous", style=discord.ButtonStyle.secondary)
+    @timed("loa_roster_page")
+    async def previous_page(self, interaction: discord.Interaction, button: ui.Button):
+        self.page -= 1
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @ui.button(label="Next", style=discord.ButtonStyle.secondary)
+    @timed("loa_roster_page")
+    async def next_page(self, interaction: discord.Interaction, button: ui.Button):
+        self.page += 1
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
 class LOAManageView(ui.View):
     def __init__(self, user_id: int):
         super().__init__(timeout=None)
@@ -207,51 +450,46 @@ class LOAManageView(ui.View):
 class LOACog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.check_expired_loas.start()
 
-    def cog_unload(self):
-        self.check_expired_loas.cancel()
-
-    @tasks.loop(minutes=1)
-    async def check_expired_loas(self):
-        # Remove expired LOAs and update/remove messages
-        to_remove = []
-        now = datetime.now(timezone.utc)
-        for uid, data in list(loa_store.items()):
-            try:
-                end_dt = parse_date(data["end"])
-                if not end_dt:
-                    continue
-                if now > end_dt or data.get("status") == "Denied":
-                    # try to edit the channel message to indicate expired/cleared or delete it
-                    ch = self.bot.get_channel(data.get("channel_id", LOA_CHANNEL_ID))
-                    msg_id = data.get("message_id")
-                    if ch and msg_id:
-                        try:
-                            msg = await ch.fetch_message(msg_id)
-                            # mark expired
-                            expired_embed = discord.Embed(
-                                title="LOA Expired / Cleared",
-                                description=(
-                                    f"**Officer:** <@{uid}>\n"
-                                    f"**Begins:** {data.get('begin')}\n"
-                                    f"**Ends:** {data.get('end')}\n"
-                                    f"**Status:** Cleared"
-                                ),
-                                color=EMBED_COLOR
-                            )
-                            expired_embed.set_thumbnail(url=THUMBNAIL_URL)
-                            await msg.edit(embed=expired_embed, view=None)
-                        except Exception:
-                            pass
-                    to_remove.append(uid)
-            except Exception:
-                continue
+    async def cog_load(self):
+        loa_store.clear()
+        loa_store.update(await self.bot.persistence.run(self.bot.storage.load_loas))
+        # Each end date is parsed once here; after that the scheduler sleeps until the next deadline
+        for uid in loa_store:
+            schedule_expiry(uid)
+            index_loa(uid)
+        expiry_schedule.start(self.expire_loas)
+        self.bot.metrics.gauge("loa_entries", "LOAs in the store.", lambda: len(loa_store))
+        self.bot.metrics.gauge(
+            "loa_pending", "LOAs awaiting review.", lambda: sum(1 for data in loa_store.values() if data["status"] == "Pending")
+        )
 
-        for uid in to_remove:
-            loa_store.pop(uid, None)
-        if to_remove:
-            save_store(loa_store)
+    def cog_unload(self):
+        expiry_schedule.stop()
+
+    async def expire_loas(self, uids: list):
+        # Called by the scheduler with the LOAs whose deadline has passed
+        await self.bot.wait_until_ready()
+        for uid in uids:
+            data = loa_store.pop(uid, None)
+            if data:
+                # try to edit the channel message to indicate expired/cleared
+                handle = MessageHandle.from_ids(data.get("channel_id", LOA_CHANNEL_ID), data.get("message_id"))
+                if handle:
+                    # mark expired
+                    expired_embed = discord.Embed(
+                        title="LOA Expired / Cleared",
+                        description=(
+                            f"**Officer:** <@{uid}>\n"
+                            f"**Begins:** {data.get('begin')}\n"
+                            f"**Ends:** {data.get('end')}\n"
+                            f"**Status:** Cleared"
+                        ),
+                        color=EMBED_COLOR
+                    )
+                    expired_embed.set_thumbnail(url=THUMBNAIL_URL)
+                    await handle.edit(self.bot, embed=expired_embed, view=None)
+            persist_loa(self.bot, uid)
 
     # Listen for button interactions globally (because we use dynamic custom_ids)
     @commands.Cog.listener()
@@ -261,13 +499,18 @@ class LOACog(commands.Cog):
             return
 
         cid = interaction.data.get("custom_id", "")
+        if cid.startswith(("loa_approve:", "loa_deny:", "loa_extend:")):
+            async with self.bot.instrumentation.handler(interaction, cid.split(":", 1)[0]):
+                await self.handle_loa_button(interaction, cid)
+
+    async def handle_loa_button(self, interaction: discord.Interaction, cid: str):
         # Approve pattern
         if cid.startswith("loa_approve:"):
             try:
                 target_id = int(cid.split(":", 1)[1])
             except Exception:
                 return
-            if not any(r.id == APPROVER_ROLE_ID for r in interaction.user.roles):
+            if not self.bot.permissions.has_role(interaction.user, APPROVER_ROLE_ID):
                 return await interaction.response.send_message("You do not have permission to approve.", ephemeral=True)
 
             uid = str(target_id)
@@ -275,41 +518,17 @@ class LOACog(commands.Cog):
                 return await interaction.response.send_message("No such LOA found.", ephemeral=True)
 
             loa_store[uid]["status"] = "Approved"
-            save_store(loa_store)
+            persist_loa(self.bot, uid)
 
             # update channel embed
-            ch = self.bot.get_channel(loa_store[uid].get("channel_id", LOA_CHANNEL_ID))
-            msg_id = loa_store[uid].get("message_id")
-            if ch and msg_id:
-                try:
-                    msg = await ch.fetch_message(msg_id)
-                    updated = discord.Embed(
-                        title="LOA Request",
-                        description=(
-                            f"**Officer:** <@{uid}>\n"
-                            f"**Begins:** {loa_store[uid]['begin']}\n"
-                            f"**Ends:** {loa_store[uid]['end']}\n"
-                            f"**Reason:** {loa_store[uid]['reason']}\n"
-                            f"**Status:** {loa_store[uid]['status']}"
-                        ),
-                        color=EMBED_COLOR
-                    )
-                    updated.set_thumbnail(url=THUMBNAIL_URL)
-                    await msg.edit(embed=updated, view=None)
-                except Exception:
-                    pass
+            await edit_loa_message(self.bot, uid, embed=status_embed(uid), view=None)
 
             # DM the user
-            user = self.bot.get_user(int(uid))
-            if user:
-                dm_embed = discord.Embed(
-                    description="Your LOA status has been updated. Use `/loa manage` to view the update.",
-                    color=EMBED_COLOR
-                )
-                try:
-                    await user.send(embed=dm_embed)
-                except Exception:
-                    pass
+            dm_embed = discord.Embed(
+                description="Your LOA status has been updated. Use `/loa manage` to view the update.",
+                color=EMBED_COLOR
+            )
+            self.bot.dm_queue.enqueue(int(uid), embed=dm_embed)
 
             await interaction.response.send_message(f"LOA Approved for <@{uid}>", ephemeral=True)
             return
@@ -320,7 +539,7 @@ class LOACog(commands.Cog):
                 target_id = int(cid.split(":", 1)[1])
             except Exception:
                 return
-            if not any(r.id == APPROVER_ROLE_ID for r in interaction.user.roles):
+            if not self.bot.permissions.has_role(interaction.user, APPROVER_ROLE_ID):
                 return await interaction.response.send_message("You do not have permission to deny.", ephemeral=True)
 
             uid = str(target_id)
@@ -328,41 +547,19 @@ class LOACog(commands.Cog):
                 return await interaction.response.send_message("No such LOA found.", ephemeral=True)
 
             loa_store[uid]["status"] = "Denied"
-            save_store(loa_store)
+            persist_loa(self.bot, uid)
 
             # update channel embed
-            ch = self.bot.get_channel(loa_store[uid].get("channel_id", LOA_CHANNEL_ID))
-            msg_id = loa_store[uid].get("message_id")
-            if ch and msg_id:
-                try:
-                    msg = await ch.fetch_message(msg_id)
-                    updated = discord.Embed(
-                        title="LOA Request",
-                        description=(
-                            f"**Officer:** <@{uid}>\n"
-                            f"**Begins:** {loa_store[uid]['begin']}\n"
-                            f"**Ends:** {loa_store[uid]['end']}\n"
-                            f"**Reason:** {loa_store[uid]['reason']}\n"
-                            f"**Status:** {loa_store[uid]['status']}"
-                        ),
-                        color=EMBED_COLOR
-                    )
-                    updated.set_thumbnail(url=THUMBNAIL_URL)
-                    await msg.edit(embed=updated, view=None)
-                except Exception:
-                    pass
+            await edit_loa_message(self.bot, uid, embed=status_embed(uid), view=None)
+            # Only after the Denied edit, so the expiry sweep's edit can't land before it
+            schedule_expiry(uid)
 
             # DM the user
-            user = self.bot.get_user(int(uid))
-            if user:
-                dm_embed = discord.Embed(
-                    description="Your LOA status has been updated. Use `/loa manage` to view the update.",
-                    color=EMBED_COLOR
-                )
-                try:
-                    await user.send(embed=dm_embed)
-                except Exception:
-                    pass
+            dm_embed = discord.Embed(
+                description="Your LOA status has been updated. Use `/loa manage` to view the update.",
+                color=EMBED_COLOR
+            )
+            self.bot.dm_queue.enqueue(int(uid), embed=dm_embed)
 
             await interaction.response.send_message(f"LOA Denied for <@{uid}>", ephemeral=True)
             return
@@ -388,6 +585,41 @@ class LOACog(commands.Cog):
         modal = LOARequestModal(interaction.user)
         await interaction.response.send_modal(modal)
 
+    @loa.command(name="review")
+    @require(APPROVER_ROLE_ID, message="You do not have permission to review LOAs.")
+    async def review(self, interaction: discord.Interaction):
+        """Approve or deny pending LOAs in bulk."""
+        view = LOAReviewView(interaction.user.id, interaction.guild)
+        if not view.pending:
+            return await interaction.response.send_message("There are no pending LOAs.", ephemeral=True)
+        await interaction.response.send_message(embed=view.render(), view=view, ephemeral=True)
+
+    @loa.command(name="roster")
+    @app_commands.describe(
+        start="Date to check, or the start of a range (MM/DD/YYYY; defaults to today)",
+        end="End of the range (MM/DD/YYYY; defaults to the start date)"
+    )
+    async def roster(self, interaction: discord.Interaction, start: Optional[str] = None, end: Optional[str] = None):
+        """List officers on approved leave on a date or during a range."""
+        start_dt = parse_date(start) if start else local_today()
+        end_dt = parse_date(end) if end else start_dt
+        if not start_dt or not end_dt:
+            return await interaction.response.send_message(
+                "Unable to parse provided dates. Use MM/DD/YYYY or YYYY-MM-DD or DD-MM-YYYY.", ephemeral=True
+            )
+        if end_dt < start_dt:
+            return await interaction.response.send_message("End date cannot be before the start date.", ephemeral=True)
+
+        uids = roster_index.overlapping(start_dt.toordinal(), end_dt.toordinal())
+        if start_dt.date() == end_dt.date():
+            title = f"On Leave | {date_to_string(start_dt)}"
+        else:
+            title = f"On Leave | {date_to_string(start_dt)} – {date_to_string(end_dt)}"
+        view = LOARosterView(interaction.user.id, uids, title)
+        await interaction.response.send_message(
+            embed=view.render(), view=view if view.pages > 1 else discord.utils.MISSING, ephemeral=True
+        )
+
     @loa.command(name="manage")
     async def manage(self, interaction: discord.Interaction):
         """View/manage your LOA (ephemeral)."""
@@ -2,35 +2,92 @@
 import discord
 from discord import app_commands, Interaction
 from discord.ext import commands
+import asyncio
 import datetime
-import json, os
+import time
+
+from utils.instrumentation import stage
+from utils.permissions import require
+from utils.scheduler import DeadlineScheduler
 
 # Config
 ZTP_ROLE_ID = 1416879960949260410
 ZTP_LOG_CHANNEL_ID = 1416893097291284500
-ZTP_STORAGE_FILE = 'ztp.json'
 THUMBNAIL_URL = "https://media.discordapp.net/attachments/1400897643772907640/1424180413076606977/Untitled_design_4.png?ex=69107e9e&is=690f2d1e&hm=74989a85019ed50ac5814b2ce101c204b3f26cfe13a3d62351af0d34c5e76cad&=&format=webp&quality=lossless"
 ADMIN_ID = 1221986685634613338
 SUPERVISOR_ROLE_ID = 1416876088331604048
+GUILD_ID = 1416869400748757124  # guild whose ZTP roles are cleaned up automatically
+CLEANUP_CONCURRENCY = 5  # role removals in flight at once; keeps a backlog under the member-edit rate limit
+CLEANUP_RETRY_SECONDS = 60  # first retry of a failed role removal; doubles per failure
+CLEANUP_RETRY_MAX_SECONDS = 3600
 
-# Helpers
-def load_json(file):
-    if not os.path.exists(file):
-        return {}
-    with open(file, 'r') as f:
-        return json.load(f)
-
-def save_json(file, data):
-    with open(file, 'w') as f:
-        json.dump(data, f, indent=4)
+# Expiry deadline for every stored ZTP, keyed by user id
+ztp_schedule = DeadlineScheduler()
+# Failed removals so far per user id, for the retry backoff
+ztp_retries: dict[int, int] = {}
 
+# Helpers
 def add_log_entry(message):
     print(f"[ZTP LOG] {message}")
 
+def with_problems(message: str, problems: list) -> str:
+    if not problems:
+        return message
+    return message + "\nHowever, " + "; ".join(problems) + "."
+
 class ZTPCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def cog_load(self):
+        # Overdue entries come due immediately, so startup reconciles them in one pass
+        expiries = await self.bot.persistence.run(self.bot.storage.load_ztp_expiries)
+        for user_id, expires in expiries.items():
+            ztp_schedule.schedule(user_id, expires)
+        ztp_schedule.start(self.expire_ztps)
+        self.bot.metrics.gauge("ztp_active", "Officers with an unexpired ZTP.", lambda: len(ztp_schedule))
+
+    def cog_unload(self):
+        ztp_schedule.stop()
+
+    async def expire_ztps(self, user_ids: list):
+        await self.bot.wait_until_ready()
+        guild = self.bot.get_guild(GUILD_ID)
+        role = guild.get_role(ZTP_ROLE_ID) if guild else None
+        limiter = asyncio.Semaphore(CLEANUP_CONCURRENCY)
+
+        def retry_later(user_id: int):
+            # The row stays, so the expiry is retried here and /ztp check still shows it
+            attempt = ztp_retries.get(user_id, 0)
+            ztp_retries[user_id] = attempt + 1
+            delay = min(CLEANUP_RETRY_SECONDS * 2 ** attempt, CLEANUP_RETRY_MAX_SECONDS)
+            ztp_schedule.schedule(user_id, time.time() + delay)
+
+        async def expire(user_id: int):
+            if not guild:
+                return retry_later(user_id)
+            if role:
+                async with limiter:
+                    try:
+                        member = guild.get_member(user_id) or await guild.fetch_member(user_id)
+                    except discord.NotFound:
+                        member = None  # left the server; nothing to remove
+                    except discord.HTTPException as e:
+                        add_log_entry(f"Could not look up {user_id} to expire their ZTP: {e}")
+                        return retry_later(user_id)
+                    if member and role in member.roles:
+                        try:
+                            await member.remove_roles(role, reason="Zero Tolerance Policy expired")
+                        except discord.HTTPException as e:
+                            add_log_entry(f"Could not remove expired ZTP role from {member}: {e}")
+                            return retry_later(user_id)
+            # Only once the role is off; queued deletes for one batch coalesce into a single transaction
+            ztp_retries.pop(user_id, None)
+            self.bot.persistence.write(("ztp", user_id), self.bot.storage.delete_ztp, user_id)
+            add_log_entry(f"Expired ZTP removed for {user_id}.")
+
+        await asyncio.gather(*(expire(user_id) for user_id in user_ids))
+
     @app_commands.command(name="ztp", description="Add or check an Officer's Zero Tolerance Policy")
     @app_commands.describe(
         officer="Mention or ID of Officer",
@@ -41,6 +98,7 @@ class ZTPCog(commands.Cog):
         app_commands.Choice(name="Add", value="add"),
         app_commands.Choice(name="Check", value="check")
     ])
+    @require(SUPERVISOR_ROLE_ID, users=(ADMIN_ID,), message="You don't have permission to use this command.")
     async def ztp_command(
         self,
         interaction: Interaction,
@@ -48,165 +106,178 @@ class ZTPCog(commands.Cog):
         length: int = 0,
         action: app_commands.Choice[str] = None
     ):
-        # Permission check
-        if not (
-            interaction.user.id == ADMIN_ID
-            or any(r.id == SUPERVISOR_ROLE_ID for r in interaction.user.roles)
-        ):
+        # Input mistakes are answered directly; anything that waits on Discord or the
+        # store runs after the interaction has been acknowledged
+        choice = action.value.lower() if action else None
+        if choice not in ("add", "check"):
             await interaction.response.send_message(
-                "You don't have permission to use this command.",
+                "Invalid action. Please select Add or Check.",
                 ephemeral=True
             )
             return
-
-        guild = interaction.guild
-        target = None
         try:
             user_id = int(officer.strip("<@!>"))
-            target = guild.get_member(user_id) or await guild.fetch_member(user_id)
-        except Exception:
+        except ValueError:
             await interaction.response.send_message(
                 "Invalid Officer mention or ID.",
                 ephemeral=True
             )
             return
+        if choice == "add" and length <= 0:
+            await interaction.response.send_message(
+                "Please provide a positive number of days for length.",
+                ephemeral=True
+            )
+            return
 
-        # Add a ZTP
-        if action.value.lower() == "add":
-            if length <= 0:
-                await interaction.response.send_message(
-                    "Please provide a positive number of days for length.",
-                    ephemeral=True
-                )
-                return
+        await interaction.response.defer(ephemeral=True, thinking=True)
 
-            ztp_data = load_json(ZTP_STORAGE_FILE)
-            issued_time = datetime.datetime.utcnow()
-            ztp_data[str(target.id)] = {
-                "issued": issued_time.timestamp(),
-                "length_days": length
-            }
-            save_json(ZTP_STORAGE_FILE, ztp_data)
+        guild = interaction.guild
+        try:
+            with stage(interaction, "resolve officer"):
+                target = guild.get_member(user_id) or await guild.fetch_member(user_id)
+        except discord.HTTPException:
+            await interaction.followup.send("Invalid Officer mention or ID.", ephemeral=True)
+            return
 
-            role = guild.get_role(ZTP_ROLE_ID)
-            if role:
-                await target.add_roles(role)
-
-            embed_log = discord.Embed(
-                title=f"Zero Tolerance Policy Issued | {target.id}",
-                description=(
-                    f"{target.mention} has been issued a Zero Tolerance Policy within the Senora Valley Police Department by the Supervisory Board.\n\n"
-                    f"- `Length:` {length} day(s)"
-                ),
-                color=0xE7BB19
+        if choice == "add":
+            await self.add_ztp(interaction, target, length)
+        else:
+            await self.check_ztp(interaction, target)
+
+    async def add_ztp(self, interaction: Interaction, target: discord.Member, length: int):
+        guild = interaction.guild
+        issued_time = datetime.datetime.now(datetime.timezone.utc)
+        self.bot.persistence.write(
+            ("ztp", target.id), self.bot.storage.save_ztp, target.id, issued_time.timestamp(), length
+        )
+        ztp_schedule.schedule(target.id, issued_time.timestamp() + length * 86400)
+        ztp_retries.pop(target.id, None)
+
+        embed_log = discord.Embed(
+            title=f"Zero Tolerance Policy Issued | {target.id}",
+            description=(
+                f"{target.mention} has been issued a Zero Tolerance Policy within the Senora Valley Police Department by the Supervisory Board.\n\n"
+                f"- `Length:` {length} day(s)"
+            ),
+            color=0xE7BB19
+        )
+        embed_log.set_thumbnail(url=THUMBNAIL_URL)
+
+        log_channel = guild.get_channel(ZTP_LOG_CHANNEL_ID)
+        if log_channel:
+            self.bot.log_sink.post(ZTP_LOG_CHANNEL_ID, embed_log)
+
+        embed_dm = discord.Embed(
+            title="SVPD | Zero-Tolerance Policy Update",
+            description=(
+                f"Hello {target.mention}, your Zero-Tolerance Policy has been updated.\n\n"
+                "- ZTP added\n\n"
+                "You can use the `/ztp` command (set type to Check) to check your ZTP status at any time."
+            ),
+            color=0xE7BB19
+        )
+        embed_dm.set_thumbnail(url=THUMBNAIL_URL)
+
+        role = guild.get_role(ZTP_ROLE_ID)
+        with stage(interaction, "role + DM"):
+            role_result, delivered = await asyncio.gather(
+                target.add_roles(role) if role else asyncio.sleep(0),
+                self.bot.dm_queue.enqueue(target, embed=embed_dm),
+                return_exceptions=True,
             )
-            embed_log.set_thumbnail(url=THUMBNAIL_URL)
 
-            log_channel = guild.get_channel(ZTP_LOG_CHANNEL_ID)
-            if log_channel:
-                await log_channel.send(embed=embed_log)
+        problems = []
+        if role is None:
+            problems.append("the ZTP role was not found")
+        elif isinstance(role_result, Exception):
+            problems.append(f"the ZTP role could not be added ({role_result})")
+        if not delivered or isinstance(delivered, Exception):
+            problems.append(f"{target.mention} could not be DMed")
+
+        add_log_entry(f"{interaction.user} added ZTP to {target} for {length} day(s).")
+        await interaction.followup.send(
+            with_problems(f"Zero Tolerance Policy added to {target.mention} for {length} day(s).", problems),
+            ephemeral=True
+        )
 
+    async def check_ztp(self, interaction: Interaction, target: discord.Member):
+        with stage(interaction, "store read"):
+            user_data = await self.bot.persistence.run(self.bot.storage.get_ztp, target.id)
+        if not user_data:
             embed_dm = discord.Embed(
-                title="SVPD | Zero-Tolerance Policy Update",
-                description=(
-                    f"Hello {target.mention}, your Zero-Tolerance Policy has been updated.\n\n"
-                    "- ZTP added\n\n"
-                    "You can use the `/ztp` command (set type to Check) to check your ZTP status at any time."
-                ),
+                title="SVPD | Zero-Tolerance Policy Status",
+                description=f"{target.mention} currently has **no active Zero-Tolerance Policy**.",
                 color=0xE7BB19
             )
             embed_dm.set_thumbnail(url=THUMBNAIL_URL)
-
-            try:
-                await target.send(embed=embed_dm)
-            except:
-                pass
-
-            add_log_entry(f"{interaction.user} added ZTP to {target} for {length} day(s).")
-            await interaction.response.send_message(
-                f"Zero Tolerance Policy added to {target.mention} for {length} day(s).",
+            self.bot.dm_queue.enqueue(target, embed=embed_dm)
+            await interaction.followup.send(
+                f"{target.mention} has no active Zero Tolerance Policy.",
                 ephemeral=True
             )
+            return
 
-        # Check a ZTP
-        elif action.value.lower() == "check":
-            ztp_data = load_json(ZTP_STORAGE_FILE)
-            user_data = ztp_data.get(str(target.id))
-            if not user_data:
-                embed_dm = discord.Embed(
-                    title="SVPD | Zero-Tolerance Policy Status",
-                    description=f"{target.mention} currently has **no active Zero-Tolerance Policy**.",
-                    color=0xE7BB19
-                )
-                embed_dm.set_thumbnail(url=THUMBNAIL_URL)
-                try:
-                    await target.send(embed=embed_dm)
-                except:
-                    pass
-                await interaction.response.send_message(
-                    f"{target.mention} has no active Zero Tolerance Policy.",
-                    ephemeral=True
-                )
-                return
-
-            issued_ts = user_data["issued"]
-            length_days = user_data["length_days"]
-            issued_dt = datetime.datetime.utcfromtimestamp(issued_ts)
-            expire_dt = issued_dt + datetime.timedelta(days=length_days)
-            now = datetime.datetime.utcnow()
-
-            if now > expire_dt:
-                # Expired → remove role + delete record
-                del ztp_data[str(target.id)]
-                save_json(ZTP_STORAGE_FILE, ztp_data)
-
-                role = guild.get_role(ZTP_ROLE_ID)
-                if role in target.roles:
-                    await target.remove_roles(role)
-
-                embed_dm = discord.Embed(
-                    title="SVPD | Zero-Tolerance Policy Status",
-                    description=f"{target.mention} previously had a Zero-Tolerance Policy which has now expired.",
-                    color=0xE7BB19
-                )
-                embed_dm.set_thumbnail(url=THUMBNAIL_URL)
-                try:
-                    await target.send(embed=embed_dm)
-                except:
-                    pass
-                await interaction.response.send_message(
-                    f"{target.mention}'s Zero Tolerance Policy has expired and been removed.",
-                    ephemeral=True
-                )
-                add_log_entry(f"Expired ZTP removed for {target}.")
-                return
+        issued_ts = user_data["issued"]
+        length_days = user_data["length_days"]
+        issued_dt = datetime.datetime.utcfromtimestamp(issued_ts)
+        expire_dt = issued_dt + datetime.timedelta(days=length_days)
+        now = datetime.datetime.utcnow()
 
-            days_left = (expire_dt - now).days
+        if now > expire_dt:
+            # Expired → remove role, then delete record
             embed_dm = discord.Embed(
                 title="SVPD | Zero-Tolerance Policy Status",
-                description=(
-                    f"{target.mention} currently has an active Zero-Tolerance Policy.\n\n"
-                    f"- `Issued:` {issued_dt.strftime('%d-%m-%Y %H:%M:%S UTC')}\n"
-                    f"- `Days Left:` {days_left} day(s)"
-                ),
+                description=f"{target.mention} previously had a Zero-Tolerance Policy which has now expired.",
                 color=0xE7BB19
             )
             embed_dm.set_thumbnail(url=THUMBNAIL_URL)
-            try:
-                await target.send(embed=embed_dm)
-            except:
-                pass
 
-            await interaction.response.send_message(
-                f"{target.mention} has an active Zero Tolerance Policy. DM sent.",
-                ephemeral=True
-            )
+            role = interaction.guild.get_role(ZTP_ROLE_ID)
+            with stage(interaction, "role + DM"):
+                role_result, delivered = await asyncio.gather(
+                    target.remove_roles(role) if role in target.roles else asyncio.sleep(0),
+                    self.bot.dm_queue.enqueue(target, embed=embed_dm),
+                    return_exceptions=True,
+                )
 
-        else:
-            await interaction.response.send_message(
-                "Invalid action. Please select Add or Check.",
+            problems = []
+            if isinstance(role_result, Exception):
+                problems.append(f"the ZTP role could not be removed ({role_result})")
+                # Keep the record; the expiry sweep retries the removal shortly
+                ztp_schedule.schedule(target.id, time.time() + CLEANUP_RETRY_SECONDS)
+            else:
+                self.bot.persistence.write(("ztp", target.id), self.bot.storage.delete_ztp, target.id)
+                ztp_schedule.cancel(target.id)
+                ztp_retries.pop(target.id, None)
+            if not delivered or isinstance(delivered, Exception):
+                problems.append(f"{target.mention} could not be DMed")
+            await interaction.followup.send(
+                with_problems(f"{target.mention}'s Zero Tolerance Policy has expired and been removed.", problems),
                 ephemeral=True
             )
+            add_log_entry(f"Expired ZTP removed for {target}.")
+            return
+
+        days_left = (expire_dt - now).days
+        embed_dm = discord.Embed(
+            title="SVPD | Zero-Tolerance Policy Status",
+            description=(
+                f"{target.mention} currently has an active Zero-Tolerance Policy.\n\n"
+                f"- `Issued:` {issued_dt.strftime('%d-%m-%Y %H:%M:%S UTC')}\n"
+                f"- `Days Left:` {days_left} day(s)"
+            ),
+            color=0xE7BB19
+        )
+        embed_dm.set_thumbnail(url=THUMBNAIL_URL)
+
+        with stage(interaction, "DM"):
+            delivered = await self.bot.dm_queue.enqueue(target, embed=embed_dm)
+        await interaction.followup.send(
+            f"{target.mention} has an active Zero Tolerance Policy. "
+            + ("DM sent." if delivered else "The DM could not be delivered."),
+            ephemeral=True
+        )
 
 
 # ------------------------------
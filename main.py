@@ -1,15 +1,30 @@
 # main.py
 import discord
 from discord.ext import commands
-import os, asyncio, logging
+import os, asyncio, logging, hashlib, json, time
 from dotenv import load_dotenv
-from threading import Thread
-from flask import Flask
+
+from utils.dm_queue import DMDispatcher
+from utils.instrumentation import Instrumentation
+from utils.log_sink import LogSink
+from utils.metrics import MetricsRegistry
+from utils.permissions import PermissionDenied, PermissionService
+from utils.persistence import Persistence
+from utils.startup import StartupProfile
+from utils.storage import Storage
+from utils.timers import TimerService
+from utils.web import StatusServer
 
 # Load environment variables
 load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")
-PORT = int(os.getenv("PORT", 5000))  # For hosting services
+PORT = int(os.getenv("PORT", 5000))  # Health check and /metrics for hosting services
+DB_FILE = os.getenv("DB_FILE", "department.db")  # SQLite store shared by all cogs
+# Sync to this guild only (instant propagation); any global commands are cleared so they don't show twice
+SYNC_GUILD_ID = int(os.getenv("SYNC_GUILD_ID", 0)) or None
+FORCE_SYNC = os.getenv("FORCE_SYNC", "").lower() in ("1", "true", "yes")  # Sync even if the tree is unchanged
+
+log = logging.getLogger("DepartmentBot")
 
 # Bot Settings
 INTENTS = discord.Intents.default()
@@ -27,37 +42,152 @@ class DepartmentBot(commands.Bot):
         super().__init__(command_prefix=PREFIX, intents=INTENTS)
         self.color = COLOR
         self.logo = LOGO_URL
+        self.startup = StartupProfile()
+        self.metrics = MetricsRegistry()
+        self.command_runs = self.metrics.counter(
+            "app_commands_total", "Slash command invocations by outcome.", ("command", "outcome")
+        )
 
     async def setup_hook(self):
-        # Auto-load cogs in the "cogs" folder
-        for filename in os.listdir("./cogs"):
-            if filename.endswith(".py"):
-                try:
-                    await self.load_extension(f"cogs.{filename[:-3]}")
-                    print(f"Loaded cog: {filename}")
-                except Exception as e:
-                    print(f"Failed to load cog {filename}: {e}")
-
-        # Sync slash commands globally
+        # Answer health checks while the rest of startup runs
+        self.status_server = StatusServer(self, PORT)
+        await self.status_server.start()
+
+        # Open the shared store before any cog reads from it; the first boot imports the old JSON files.
+        # All disk work after this point goes through self.persistence, off the event loop.
+        with self.startup.phase("storage"):
+            self.storage = await asyncio.to_thread(Storage, DB_FILE)
+            self.persistence = Persistence(self.storage)
+            await self.persistence.run(self.storage.migrate_json, ".")
+        # Cogs register timer handlers while loading; pending timers start once they are all in
+        self.timers = TimerService(self)
+        self.dm_queue = DMDispatcher(self)
+        self.dm_queue.start()
+        self.log_sink = LogSink(self)
+        self.permissions = PermissionService(self)
+        self.tree.on_error = self.on_app_command_error
+        self.instrumentation = Instrumentation(self)
+        self.register_service_metrics()
+
+        # Auto-load cogs in the "cogs" folder. Cogs don't depend on each other, so their
+        # async setup (store reads in cog_load) overlaps instead of running back to back.
+        with self.startup.phase("cogs"):
+            extensions = [f"cogs.{filename[:-3]}" for filename in sorted(os.listdir("./cogs")) if filename.endswith(".py")]
+            await asyncio.gather(*(self.load_cog(name) for name in extensions))
+
+        with self.startup.phase("timers"):
+            await self.timers.start()
+
+        # Sync slash commands only when their definitions changed since the last sync
+        with self.startup.phase("command sync"):
+            try:
+                await self.sync_commands()
+            except Exception:
+                log.exception("Command sync failed")
+        self.setup_done = time.perf_counter()
+
+    def register_service_metrics(self):
+        gauge = self.metrics.gauge
+        gauge("gateway_latency_seconds", "Gateway heartbeat latency.", lambda: self.latency)
+        gauge("dm_queue_depth", "DMs waiting for a worker.", lambda: self.dm_queue.depth)
+        gauge("dm_sent_total", "DMs delivered.", lambda: self.dm_queue.sent, "counter")
+        gauge("dm_failed_total", "DMs that failed or gave up.", lambda: self.dm_queue.failed, "counter")
+        gauge("dm_dead_lettered_total", "DMs Discord refused.", lambda: self.dm_queue.dead_lettered, "counter")
+        gauge("dm_retries_total", "DM retries after 429/5xx.", lambda: self.dm_queue.retries, "counter")
+        gauge("log_sink_depth", "Log embeds waiting to be posted.", lambda: self.log_sink.depth)
+        gauge("log_messages_total", "Log channel messages sent.", lambda: self.log_sink.messages_sent, "counter")
+        gauge("persistence_pending_writes", "Queued store writes not yet flushed.", lambda: self.persistence.pending)
+        gauge("timers_scheduled", "Pending timers.", lambda: len(self.timers))
+        gauge("role_index_members", "Members in the permission role index.", lambda: len(self.permissions))
+
+    async def load_cog(self, name: str):
+        started = time.perf_counter()
         try:
-            synced = await self.tree.sync()
-            print(f"Synced {len(synced)} commands globally")
+            await self.load_extension(name)
         except Exception as e:
-            print(f"Command sync failed: {e}")
+            self.startup.failed[name] = str(e)
+            log.exception("Failed to load cog %s", name)
+            return
+        self.startup.cog_load[name] = time.perf_counter() - started
 
-    async def on_ready(self):
-        print(f"\nBot is online as {self.user} (ID: {self.user.id})")
-        print("------")
+    async def add_cog(self, cog: commands.Cog, /, **kwargs):
+        # Time spent here (including cog_load) is the cog's setup share of its load time
+        started = time.perf_counter()
+        await super().add_cog(cog, **kwargs)
+        module = type(cog).__module__
+        self.startup.cog_setup[module] = self.startup.cog_setup.get(module, 0.0) + time.perf_counter() - started
 
-# ---------------- Flask Server ----------------
-app = Flask("DepartmentBot")
+    def command_tree_hash(self, guild: discord.abc.Snowflake | None = None) -> str:
+        """Stable digest of the payload tree.sync() would upload."""
+        payload = [command.to_dict(self.tree) for command in self.tree.get_commands(guild=guild)]
+        payload.sort(key=lambda command: (command.get("type", 1), command["name"]))
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
 
-@app.route("/")
-def home():
-    return "Bot is running", 200
+    async def sync_commands(self):
+        guild = discord.Object(id=SYNC_GUILD_ID) if SYNC_GUILD_ID else None
+        if guild is not None:
+            self.tree.copy_global_to(guild=guild)
+            await self.clear_global_commands()
+        scope = f"guild {SYNC_GUILD_ID}" if guild is not None else "globally"
 
-def run_flask():
-    app.run(host="0.0.0.0", port=PORT)
+        meta_key = f"command_tree_hash:{SYNC_GUILD_ID or 'global'}"
+        digest = self.command_tree_hash(guild)
+        if not FORCE_SYNC and digest == await self.persistence.run(self.storage.get_meta, meta_key):
+            log.info("Commands unchanged; skipped sync %s", scope)
+            return
+
+        synced = await self.tree.sync(guild=guild)
+        self.persistence.write(("meta", meta_key), self.storage.set_meta, meta_key, digest)
+        log.info("Synced %d commands %s", len(synced), scope)
+
+    async def clear_global_commands(self):
+        # Commands synced globally before switching to guild mode would appear twice in that guild.
+        # The guild copies are already made, so the global set is emptied locally and, once, remotely.
+        self.tree.clear_commands(guild=None)
+        meta_key = "command_tree_hash:global"
+        digest = self.command_tree_hash()
+        if not FORCE_SYNC and digest == await self.persistence.run(self.storage.get_meta, meta_key):
+            return
+        await self.tree.sync()
+        self.persistence.write(("meta", meta_key), self.storage.set_meta, meta_key, digest)
+        log.info("Cleared global commands for guild-only sync")
+
+    async def close(self):
+        if hasattr(self, "log_sink"):
+            await self.log_sink.close()  # post buffered log embeds while the connection is still open
+        await super().close()
+        if hasattr(self, "status_server"):
+            await self.status_server.stop()
+        if hasattr(self, "timers"):
+            self.timers.stop()
+            self.dm_queue.stop()
+        if hasattr(self, "persistence"):
+            await self.persistence.close()
+            self.storage.close()
+
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        name = command.qualified_name
+        self.command_runs.inc(name, "ok")
+        self.instrumentation.finish(interaction, name)
+
+    async def on_app_command_error(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
+        name = interaction.command.qualified_name if interaction.command else "unknown"
+        self.command_runs.inc(name, "denied" if isinstance(error, PermissionDenied) else "error")
+        self.instrumentation.finish(interaction, name)
+        if isinstance(error, PermissionDenied):
+            if interaction.response.is_done():
+                await interaction.followup.send(str(error), ephemeral=True)
+            else:
+                await interaction.response.send_message(str(error), ephemeral=True)
+            return
+        log.error("Ignoring exception in command %r", name, exc_info=error)
+
+    async def on_ready(self):
+        log.info("Bot is online as %s (ID: %s)", self.user, self.user.id)
+        if not self.startup.reported:  # on_ready fires again after reconnects
+            self.startup.reported = True
+            self.startup.mark("gateway ready", self.setup_done)
+            log.info(self.startup.report())
 
 # ---------------- Logging setup ----------------
 logging.basicConfig(
@@ -67,11 +197,7 @@ logging.basicConfig(
 
 bot = DepartmentBot()
 
-# ---------------- Run both ----------------
+# ---------------- Run ----------------
 if __name__ == "__main__":
-    # Run Flask in a separate thread
-    flask_thread = Thread(target=run_flask)
-    flask_thread.start()
-
-    # Run Discord bot
+    # The status server runs on the bot's own event loop (started in setup_hook)
     asyncio.run(bot.start(TOKEN))
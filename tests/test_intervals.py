@@ -0,0 +1,57 @@
+import random
+
+from utils.intervals import IntervalIndex
+
+
+def brute_force(intervals: dict, start: int, end: int) -> set:
+    return {key for key, (lo, hi) in intervals.items() if lo <= end and hi >= start}
+
+
+def test_matches_brute_force_overlap():
+    rng = random.Random(1844)
+    for _ in range(300):
+        index = IntervalIndex()
+        intervals = {}
+        for key in range(rng.randint(0, 40)):
+            lo = rng.randint(0, 100)
+            intervals[key] = (lo, lo + rng.randint(0, 30))
+            index.add(key, *intervals[key])
+        # Churn after the first build, so rebuilds are exercised too
+        index.overlapping(0, 0)
+        for key in rng.sample(sorted(intervals), k=len(intervals) // 4):
+            del intervals[key]
+            index.remove(key)
+
+        lo = rng.randint(-10, 130)
+        hi = lo + rng.randint(0, 20)
+        assert set(index.overlapping(lo, hi)) == brute_force(intervals, lo, hi)
+        assert set(index.at(lo)) == brute_force(intervals, lo, lo)
+
+
+def test_bounds_are_inclusive():
+    index = IntervalIndex()
+    index.add("a", 10, 20)
+    assert index.at(10) == ["a"]
+    assert index.at(20) == ["a"]
+    assert index.at(21) == []
+    assert index.overlapping(0, 9) == []
+
+
+def test_results_are_ordered_by_start():
+    index = IntervalIndex()
+    index.add("late", 50, 60)
+    index.add("early", 0, 100)
+    index.add("middle", 20, 55)
+    assert index.overlapping(52, 53) == ["early", "middle", "late"]
+
+
+def test_add_replaces_and_remove_forgets():
+    index = IntervalIndex()
+    index.add("a", 0, 10)
+    index.add("a", 30, 40)
+    assert index.at(5) == []
+    assert index.at(35) == ["a"]
+    index.remove("a")
+    index.remove("missing")
+    assert len(index) == 0
+    assert index.at(35) == []
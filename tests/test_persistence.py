@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from utils.persistence import Persistence
+from utils.storage import Storage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = Storage(tmp_path / "department.db")
+    yield storage
+    storage.close()
+
+
+def test_writes_with_the_same_key_coalesce(storage):
+    calls = []
+
+    async def scenario():
+        persistence = Persistence(storage, delay=0.01)
+        for value in range(5):
+            persistence.write("key", calls.append, value)
+        assert persistence.pending == 1
+        await persistence.close()
+
+    asyncio.run(scenario())
+    assert calls == [4]
+
+
+def test_batch_applies_writes_in_order_of_latest_update(storage):
+    calls = []
+
+    async def scenario():
+        persistence = Persistence(storage, delay=0.01)
+        persistence.write("a", calls.append, "a1")
+        persistence.write("b", calls.append, "b1")
+        persistence.write("a", calls.append, "a2")
+        await persistence.close()
+
+    asyncio.run(scenario())
+    assert calls == ["b1", "a2"]
+
+
+def test_run_observes_queued_writes(storage):
+    async def scenario():
+        persistence = Persistence(storage, delay=60)
+        persistence.write(("ztp", 7), storage.save_ztp, 7, 1000.0, 3)
+        found = await persistence.run(storage.get_ztp, 7)
+        await persistence.close()
+        return found
+
+    assert asyncio.run(scenario())["length_days"] == 3
+
+
+def test_flush_happens_after_delay(storage):
+    async def scenario():
+        persistence = Persistence(storage, delay=0.01)
+        persistence.write(("ztp", 7), storage.save_ztp, 7, 1000.0, 3)
+        await asyncio.sleep(0.2)
+        assert persistence.pending == 0
+        await persistence.close()
+
+    asyncio.run(scenario())
+    assert storage.get_ztp(7) is not None
+
+
+def test_failed_write_does_not_drop_the_rest_of_the_batch(storage):
+    def fail():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        persistence = Persistence(storage, delay=60)
+        persistence.write(("ztp", 1), storage.save_ztp, 1, 1000.0, 1)
+        persistence.write("bad", fail)
+        persistence.write(("ztp", 2), storage.save_ztp, 2, 1000.0, 2)
+        await persistence.close()
+
+    asyncio.run(scenario())
+    assert storage.get_ztp(1) is not None
+    assert storage.get_ztp(2) is not None
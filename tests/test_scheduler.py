@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+from utils.scheduler import DeadlineScheduler
+
+
+def run_scheduler(setup, wait=0.2, batch_size=50):
+    """Start a scheduler, apply ``setup`` to it and collect the batches it fires within ``wait`` seconds."""
+    batches = []
+
+    async def scenario():
+        scheduler = DeadlineScheduler(batch_size=batch_size)
+
+        async def callback(keys):
+            batches.append(keys)
+
+        scheduler.start(callback)
+        setup(scheduler)
+        await asyncio.sleep(wait)
+        scheduler.stop()
+        return scheduler
+
+    return batches, asyncio.run(scenario())
+
+
+def test_fires_keys_in_deadline_order():
+    now = time.time()
+
+    def setup(scheduler):
+        scheduler.schedule("late", now + 0.1)
+        scheduler.schedule("early", now + 0.02)
+        scheduler.schedule("overdue", now - 10)
+
+    batches, scheduler = run_scheduler(setup)
+    assert [key for batch in batches for key in batch] == ["overdue", "early", "late"]
+    assert len(scheduler) == 0
+
+
+def test_reschedule_replaces_the_old_deadline():
+    now = time.time()
+
+    def setup(scheduler):
+        scheduler.schedule("a", now + 0.02)
+        scheduler.schedule("a", now + 60)
+
+    batches, scheduler = run_scheduler(setup)
+    assert batches == []
+    assert scheduler.deadline("a") == now + 60
+
+
+def test_reschedule_earlier_wakes_the_task():
+    now = time.time()
+
+    def setup(scheduler):
+        scheduler.schedule("a", now + 60)
+        scheduler.schedule("a", now + 0.02)
+
+    batches, _ = run_scheduler(setup)
+    assert batches == [["a"]]
+
+
+def test_cancel_stops_the_key_firing():
+    now = time.time()
+
+    def setup(scheduler):
+        scheduler.schedule("a", now + 0.02)
+        scheduler.schedule("b", now + 0.02)
+        scheduler.cancel("a")
+
+    batches, _ = run_scheduler(setup)
+    assert batches == [["b"]]
+
+
+def test_due_keys_are_batched():
+    now = time.time()
+
+    def setup(scheduler):
+        for n in range(5):
+            scheduler.schedule(n, now - 1)
+
+    batches, _ = run_scheduler(setup, batch_size=2)
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+
+
+def test_heap_is_compacted_after_many_reschedules():
+    scheduler = DeadlineScheduler()
+    for n in range(1000):
+        scheduler.schedule("a", time.time() + 60 + n)
+    assert len(scheduler) == 1
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 65
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from utils.storage import MIGRATED_SUFFIX, Storage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = Storage(tmp_path / "department.db")
+    yield storage
+    storage.close()
+
+
+def write_legacy(base, loas=None, ztps=None, auths=None):
+    if loas is not None:
+        (base / "loa_store.json").write_text(json.dumps(loas))
+    if ztps is not None:
+        (base / "ztp.json").write_text(json.dumps(ztps))
+    if auths is not None:
+        (base / "authorization_logs.json").write_text(json.dumps(auths))
+
+
+def test_migrate_json_imports_legacy_files(storage, tmp_path):
+    write_legacy(
+        tmp_path,
+        loas={"42": {"status": "Approved", "begin": "01/01/2026", "end": "01/05/2026", "reason": "trip"}},
+        ztps={"7": {"issued": 1000.0, "length_days": 3}},
+        auths=[
+            {"id": 5, "action": "Accepted", "access_level": 2, "authorized_by": 1, "timestamp": "t1"},
+            {"id": 5, "action": "Accepted", "access_level": 4, "authorized_by": 1, "timestamp": "t2"},
+        ],
+    )
+
+    storage.migrate_json(tmp_path)
+
+    assert storage.load_loas()["42"]["reason"] == "trip"
+    assert storage.get_ztp(7) == {"issued": 1000.0, "length_days": 3, "expires": 1000.0 + 3 * 86400}
+    # Later entries for the same user win
+    assert storage.get_authorization(5)["access_level"] == 4
+
+
+def test_migrate_json_renames_files_aside(storage, tmp_path):
+    write_legacy(tmp_path, loas={}, ztps={}, auths=[])
+
+    storage.migrate_json(tmp_path)
+
+    for name in ("loa_store.json", "ztp.json", "authorization_logs.json"):
+        assert not (tmp_path / name).exists()
+        assert (tmp_path / (name + MIGRATED_SUFFIX)).exists()
+
+
+def test_migrate_json_runs_once(storage, tmp_path):
+    write_legacy(tmp_path, auths=[{"id": 5, "action": "Accepted", "access_level": 2}])
+    storage.migrate_json(tmp_path)
+
+    write_legacy(tmp_path, auths=[{"id": 6, "action": "Accepted", "access_level": 3}])
+    storage.migrate_json(tmp_path)
+
+    assert storage.get_authorization(6) is None
+    assert (tmp_path / "authorization_logs.json").exists()
+
+
+def test_migrate_json_tolerates_empty_and_missing_files(storage, tmp_path):
+    (tmp_path / "ztp.json").write_text("")
+
+    storage.migrate_json(tmp_path)
+
+    assert storage.load_loas() == {}
+    assert storage.load_ztp_expiries() == {}
+    assert storage.get_meta("json_migrated")
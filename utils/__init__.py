@@ -0,0 +1,3 @@
+# utils/__init__.py
+# Shared helpers used by the cogs. Kept outside ./cogs so the auto-loader
+# in main.py does not try to load these modules as extensions.
@@ -0,0 +1,102 @@
+# utils/attachments.py
+import asyncio
+import logging
+import tempfile
+from contextlib import asynccontextmanager
+
+import aiohttp
+import discord
+
+log = logging.getLogger(__name__)
+
+MAX_ATTACHMENT_BYTES = 8 * 1024 * 1024   # larger files are skipped, not relayed
+MAX_MESSAGE_BYTES = 10 * 1024 * 1024     # total per relayed message (Discord's default upload limit)
+MAX_CONCURRENT_TRANSFERS = 3
+CHUNK_BYTES = 64 * 1024
+
+
+class AttachmentRelay:
+    """Re-uploads message attachments without holding whole files in memory.
+
+    Each attachment is streamed in fixed-size chunks into an anonymous temp file,
+    and the upload reads back from that file. Only a few relays download or upload
+    at once, so many large files arriving together queue up instead of piling up
+    in memory.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = MAX_ATTACHMENT_BYTES,
+        max_message_bytes: int = MAX_MESSAGE_BYTES,
+        concurrency: int = MAX_CONCURRENT_TRANSFERS,
+    ):
+        self.max_bytes = max_bytes
+        self.max_message_bytes = max_message_bytes
+        self._limiter = asyncio.Semaphore(concurrency)
+        self._session: aiohttp.ClientSession | None = None
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @asynccontextmanager
+    async def spooled(self, attachments: list[discord.Attachment]):
+        """Yield ``(files, skipped)``: discord.File objects ready to send, and names not relayed.
+
+        Keep sending inside the ``async with`` block; the temp files are closed on exit.
+        """
+        if not attachments:
+            yield [], []
+            return
+
+        async with self._limiter:
+            spools, files, skipped = [], [], []
+            total = 0
+            try:
+                for attachment in attachments:
+                    if attachment.size > self.max_bytes or total + attachment.size > self.max_message_bytes:
+                        skipped.append(attachment.filename)
+                        continue
+                    spool = await self._download(attachment)
+                    if spool is None:
+                        skipped.append(attachment.filename)
+                        continue
+                    spools.append(spool)
+                    total += attachment.size
+                    files.append(discord.File(spool, filename=attachment.filename, spoiler=attachment.is_spoiler()))
+                yield files, skipped
+            finally:
+                for spool in spools:
+                    spool.close()
+
+    async def _download(self, attachment: discord.Attachment):
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+
+        spool = tempfile.TemporaryFile()
+        size = 0
+        try:
+            async with self._session.get(attachment.url) as resp:
+                resp.raise_for_status()
+                async for chunk in resp.content.iter_chunked(CHUNK_BYTES):
+                    size += len(chunk)
+                    if size > self.max_bytes:  # the advertised size was wrong
+                        spool.close()
+                        return None
+                    spool.write(chunk)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            log.warning("Could not download attachment %s: %s", attachment.filename, e)
+            spool.close()
+            return None
+        spool.seek(0)
+        return spool
+
+
+def note_skipped(embed: discord.Embed, skipped: list[str]):
+    if skipped:
+        embed.add_field(
+            name="Attachments not relayed",
+            value=", ".join(skipped)[:1000] + f"\n(limit {MAX_ATTACHMENT_BYTES // (1024 * 1024)} MB per file)",
+            inline=False,
+        )
@@ -0,0 +1,162 @@
+# utils/dm_queue.py
+import asyncio
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable
+
+import discord
+from discord.ext import commands
+
+log = logging.getLogger(__name__)
+
+DM_WORKERS = 4         # DMs in flight at once
+DM_MAX_ATTEMPTS = 4    # first try plus retries on 429/5xx
+DM_RETRY_BASE = 2.0    # seconds; doubled for each 5xx retry
+DM_LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0)  # seconds from enqueue to delivery
+
+OnSent = Callable[[discord.Message], Awaitable]
+
+
+class _Job:
+    __slots__ = ("user_id", "kwargs", "on_sent", "future", "queued_at")
+
+    def __init__(self, user_id: int, kwargs: dict, on_sent: OnSent | None, future: asyncio.Future):
+        self.user_id = user_id
+        self.kwargs = kwargs
+        self.on_sent = on_sent
+        self.future = future
+        self.queued_at = time.monotonic()
+
+
+def _rewind_files(kwargs: dict):
+    # discord.File hands its file back to aiohttp's closing behaviour after a send,
+    # so a retry needs fresh wrappers around the rewound files
+    files = kwargs.get("files")
+    if files:
+        for f in files:
+            f.reset()
+        kwargs["files"] = [discord.File(f.fp, filename=f.filename, description=f.description) for f in files]
+
+
+def _summary(kwargs: dict) -> str:
+    if kwargs.get("content"):
+        return str(kwargs["content"])[:200]
+    embed = kwargs.get("embed")
+    if embed is not None:
+        return (embed.title or embed.description or "")[:200]
+    return ""
+
+
+class DMDispatcher:
+    """Queue for outbound DMs, delivered by a small pool of workers.
+
+    ``enqueue()`` returns at once with a future that resolves to the sent
+    message, or None if delivery failed. Rate limits back off per recipient
+    (each DM channel is its own route), server errors are retried with
+    exponential backoff, and DMs that Discord refuses (closed DMs, blocked bot)
+    are recorded in the ``dm_dead_letters`` table.
+    """
+
+    def __init__(self, bot: commands.Bot, workers: int = DM_WORKERS, max_attempts: int = DM_MAX_ATTEMPTS):
+        self.bot = bot
+        self.max_attempts = max_attempts
+        self._worker_count = workers
+        self._queue: asyncio.Queue[_Job] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+        self._backoff_until: dict[int, float] = {}
+        self._dead_letter_ids = itertools.count()
+        self.sent = 0
+        self.failed = 0
+        self.dead_lettered = 0
+        self.retries = 0
+        self.latency = bot.metrics.histogram(
+            "dm_delivery_seconds", "Time from enqueue until the DM was delivered.", buckets=DM_LATENCY_BUCKETS
+        )
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self):
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self._worker_count)]
+
+    def stop(self):
+        for task in self._workers:
+            task.cancel()
+        self._workers = []
+
+    def enqueue(self, user: discord.abc.Snowflake | int, *, on_sent: OnSent | None = None, **send_kwargs) -> asyncio.Future:
+        """Queue ``user.send(**send_kwargs)``. ``on_sent`` is awaited with the message after delivery."""
+        user_id = user if isinstance(user, int) else user.id
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_Job(user_id, send_kwargs, on_sent, future))
+        return future
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                message = await self._deliver(job)
+            except Exception:
+                log.exception("DM delivery to %s crashed", job.user_id)
+                message = None
+            if not job.future.done():
+                job.future.set_result(message)
+            self._queue.task_done()
+
+    async def _deliver(self, job: _Job) -> discord.Message | None:
+        for attempt in range(1, self.max_attempts + 1):
+            wait = self._backoff_until.get(job.user_id, 0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if attempt > 1:
+                _rewind_files(job.kwargs)
+
+            try:
+                channel = await self.bot.create_dm(discord.Object(id=job.user_id))
+                message = await channel.send(**job.kwargs)
+            except discord.Forbidden as e:
+                self._dead_letter(job, e)
+                return None
+            except discord.RateLimited as e:
+                delay = e.retry_after
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    delay = float(e.response.headers.get("Retry-After", DM_RETRY_BASE))
+                elif e.status >= 500:
+                    delay = DM_RETRY_BASE * 2 ** (attempt - 1)
+                else:
+                    log.warning("DM to %s failed: %s", job.user_id, e)
+                    self.failed += 1
+                    return None
+            else:
+                self._backoff_until.pop(job.user_id, None)
+                self.sent += 1
+                self.latency.observe(time.monotonic() - job.queued_at)
+                if job.on_sent is not None:
+                    try:
+                        await job.on_sent(message)
+                    except Exception:
+                        log.exception("Post-delivery hook for DM to %s failed", job.user_id)
+                return message
+
+            self.retries += 1
+            self._backoff_until[job.user_id] = time.monotonic() + delay
+
+        log.warning("DM to %s gave up after %d attempts", job.user_id, self.max_attempts)
+        self.failed += 1
+        return None
+
+    def _dead_letter(self, job: _Job, error: discord.HTTPException):
+        self.dead_lettered += 1
+        log.info("DM to %s is undeliverable: %s", job.user_id, error)
+        self.bot.persistence.write(
+            ("dm_dead_letter", next(self._dead_letter_ids)),
+            self.bot.storage.save_dm_dead_letter,
+            job.user_id,
+            time.time(),
+            str(error),
+            _summary(job.kwargs),
+        )
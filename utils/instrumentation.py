@@ -0,0 +1,184 @@
+# utils/instrumentation.py
+import asyncio
+import functools
+import logging
+import re
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+import discord
+from discord.ext import commands
+
+log = logging.getLogger(__name__)
+
+RESPONSE_DEADLINE = 3.0     # seconds Discord allows before the first response
+SLOW_HANDLER_SECONDS = 2.0  # handlers slower than this are logged with their stages
+RESPONSE_POLL = 0.02        # seconds between checks for the first response
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0)
+NAME_GRACE_SECONDS = 60.0   # how long response metrics wait for the handler's final name
+UNNAMED = "unnamed"         # label for components and modals with discord.py's random custom_id
+
+_AUTO_CUSTOM_ID = re.compile(r"[0-9a-f]{32}")  # os.urandom(16).hex()
+
+_TRACED = {
+    discord.InteractionType.application_command: "command",
+    discord.InteractionType.component: "component",
+    discord.InteractionType.modal_submit: "modal",
+}
+
+
+class Trace:
+    """Timing for one interaction, kept in ``interaction.extras["trace"]``."""
+
+    __slots__ = ("kind", "name", "received", "offset", "first_response", "stages", "finished", "done")
+
+    def __init__(self, kind: str, name: str, offset: float):
+        self.kind = kind
+        self.name = name
+        self.received = time.perf_counter()
+        self.offset = offset            # seconds between Discord creating the interaction and us receiving it
+        self.first_response: float | None = None
+        self.stages: list[tuple[str, float]] = []
+        self.finished = False
+        self.done = asyncio.Event()     # set by finish(), once the name is final
+
+    def elapsed(self) -> float:
+        """Seconds since Discord created the interaction."""
+        return self.offset + time.perf_counter() - self.received
+
+
+class Instrumentation:
+    """Records response latency, handler time and deadline misses for every interaction.
+
+    A trace starts when the interaction arrives. A watcher notes when the first
+    response goes out and counts a miss if none has by the 3-second deadline; both
+    are recorded once the handler finishes, under its final name.
+    Handlers are timed from arrival to completion: app commands through the tree's
+    completion and error events, and views and modals through ``@timed``. Inside
+    a handler, ``stage(interaction, name)`` times individual steps for the slow log.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.first_response = bot.metrics.histogram(
+            "interaction_first_response_seconds", "Time until the interaction was acknowledged.",
+            ("kind", "name"), LATENCY_BUCKETS,
+        )
+        self.handler_time = bot.metrics.histogram(
+            "interaction_handler_seconds", "Time until the handler finished.", ("kind", "name"), LATENCY_BUCKETS
+        )
+        self.deadline_misses = bot.metrics.counter(
+            "interaction_deadline_misses_total", "Interactions not acknowledged within 3 seconds.", ("kind", "name")
+        )
+        self._watchers: set[asyncio.Task] = set()
+        # The tree starts its invoker task before on_interaction is dispatched, so commands
+        # open their trace from the tree's own check; the listener covers views and modals
+        bot.tree.interaction_check = self._tree_check
+        bot.add_listener(self._on_interaction, "on_interaction")
+
+    async def _tree_check(self, interaction: discord.Interaction) -> bool:
+        self.begin(interaction)
+        return True
+
+    async def _on_interaction(self, interaction: discord.Interaction):
+        self.begin(interaction)
+
+    def begin(self, interaction: discord.Interaction) -> Trace | None:
+        """Start tracing ``interaction``; returns the existing trace if one was already started."""
+        trace: Trace | None = interaction.extras.get("trace")
+        kind = _TRACED.get(interaction.type)
+        if trace is not None or kind is None:
+            return trace
+        data = interaction.data or {}
+        name = data.get("name") or _custom_id_label(data.get("custom_id", ""))
+        offset = max(0.0, (discord.utils.utcnow() - interaction.created_at).total_seconds())
+        trace = interaction.extras["trace"] = Trace(kind, name, offset)
+        task = asyncio.create_task(self._watch(interaction, trace))
+        self._watchers.add(task)
+        task.add_done_callback(self._watchers.discard)
+        return trace
+
+    async def _watch(self, interaction: discord.Interaction, trace: Trace):
+        missed = False
+        while not interaction.response.is_done():
+            if trace.elapsed() >= RESPONSE_DEADLINE:
+                missed = True
+                log.warning("%s %r was not acknowledged within %.0fs", trace.kind, trace.name, RESPONSE_DEADLINE)
+                break
+            await asyncio.sleep(RESPONSE_POLL)
+        else:
+            trace.first_response = trace.elapsed()
+
+        # Record under the name @timed gives the handler, not the initial custom_id label,
+        # so random custom_ids never become series of their own
+        try:
+            await asyncio.wait_for(trace.done.wait(), timeout=NAME_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        if missed:
+            self.deadline_misses.inc(trace.kind, trace.name)
+        else:
+            self.first_response.observe(trace.first_response, trace.kind, trace.name)
+
+    def finish(self, interaction: discord.Interaction, name: str | None = None):
+        # A handler can fail before the listener runs (e.g. a check that never awaits)
+        trace = self.begin(interaction)
+        if trace is None or trace.finished:
+            return
+        trace.finished = True
+        if name:
+            trace.name = name
+        trace.done.set()
+        total = trace.elapsed()
+        self.handler_time.observe(total, trace.kind, trace.name)
+        if total >= SLOW_HANDLER_SECONDS:
+            first = f"{trace.first_response * 1000:.0f} ms" if trace.first_response is not None else "none"
+            stages = ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in trace.stages) or "no stages"
+            log.warning(
+                "Slow %s %r: %.0f ms total (queued %.0f ms, first response %s; %s)",
+                trace.kind, trace.name, total * 1000, trace.offset * 1000, first, stages,
+            )
+
+    @asynccontextmanager
+    async def handler(self, interaction: discord.Interaction, name: str | None = None):
+        self.begin(interaction)
+        try:
+            yield
+        finally:
+            self.finish(interaction, name)
+
+
+def _custom_id_label(custom_id: str) -> str:
+    """Metric label for a component or modal: the prefix before ``:`` of a fixed custom_id."""
+    prefix = custom_id.split(":", 1)[0]
+    if not prefix or _AUTO_CUSTOM_ID.fullmatch(prefix):
+        return UNNAMED
+    return prefix
+
+
+@contextmanager
+def stage(interaction: discord.Interaction, name: str):
+    """Time one step of a handler; a no-op for untraced interactions."""
+    trace: Trace | None = interaction.extras.get("trace")
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if trace is not None:
+            trace.stages.append((name, time.perf_counter() - started))
+
+
+def timed(name: str | None = None):
+    """Decorator for view callbacks and ``Modal.on_submit``: record handler time under ``name``."""
+
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
+            async with interaction.client.instrumentation.handler(interaction, label):
+                return await func(self, interaction, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,82 @@
+# utils/intervals.py
+from typing import Hashable
+
+
+class IntervalIndex:
+    """Closed integer intervals ``[start, end]`` keyed by id, queried by overlap.
+
+    The intervals are kept in a dict; the search structure is an augmented
+    interval tree laid out implicitly over the intervals sorted by start (each
+    midpoint is a node that records the largest end in its subtree). It is built
+    on the first query after a change, so bursts of updates cost nothing until
+    someone asks. A query visits O(log n + k) nodes for k results.
+    """
+
+    def __init__(self):
+        self._intervals: dict[Hashable, tuple[int, int]] = {}
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+        self._keys: list[Hashable] = []
+        self._max_end: list[int] = []
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._intervals
+
+    def add(self, key: Hashable, start: int, end: int):
+        if self._intervals.get(key) != (start, end):
+            self._intervals[key] = (start, end)
+            self._dirty = True
+
+    def remove(self, key: Hashable):
+        if self._intervals.pop(key, None) is not None:
+            self._dirty = True
+
+    def at(self, point: int) -> list:
+        """Keys whose interval contains ``point`` (stabbing query)."""
+        return self.overlapping(point, point)
+
+    def overlapping(self, start: int, end: int) -> list:
+        """Keys whose interval shares at least one point with ``[start, end]``, ordered by start."""
+        if self._dirty:
+            self._build()
+        found = []
+        self._search(0, len(self._keys), start, end, found)
+        return found
+
+    def _build(self):
+        ordered = sorted(self._intervals.items(), key=lambda item: item[1])
+        self._keys = [key for key, _ in ordered]
+        self._starts = [span[0] for _, span in ordered]
+        self._ends = [span[1] for _, span in ordered]
+        self._max_end = [0] * len(ordered)
+        self._fill(0, len(ordered))
+        self._dirty = False
+
+    def _fill(self, lo: int, hi: int) -> int | None:
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        best = self._ends[mid]
+        for child in (self._fill(lo, mid), self._fill(mid + 1, hi)):
+            if child is not None and child > best:
+                best = child
+        self._max_end[mid] = best
+        return best
+
+    def _search(self, lo: int, hi: int, start: int, end: int, found: list):
+        # In-order walk, pruned by subtree max end (left) and by node start (right)
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self._max_end[mid] < start:
+            return  # everything below ends before the query begins
+        self._search(lo, mid, start, end, found)
+        if self._starts[mid] > end:
+            return  # this node and everything to its right start after the query ends
+        if self._ends[mid] >= start:
+            found.append(self._keys[mid])
+        self._search(mid + 1, hi, start, end, found)
@@ -0,0 +1,87 @@
+# utils/log_sink.py
+import asyncio
+import logging
+
+import discord
+from discord.ext import commands
+
+log = logging.getLogger(__name__)
+
+LOG_FLUSH_DELAY = 2.0         # seconds an embed may wait for others to share its message
+MAX_EMBEDS_PER_MESSAGE = 10   # Discord limits
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+
+class LogSink:
+    """Buffers log-channel embeds and posts them up to 10 per message.
+
+    A channel's buffer is flushed when it fills up or ``LOG_FLUSH_DELAY`` seconds
+    after its first embed arrived, whichever comes first. Flushes for a channel
+    run one at a time and always take the oldest embeds, so order is preserved.
+    """
+
+    def __init__(self, bot: commands.Bot, delay: float = LOG_FLUSH_DELAY):
+        self.bot = bot
+        self.delay = delay
+        self._buffers: dict[int, list[discord.Embed]] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._timers: dict[int, asyncio.Task] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.messages_sent = 0
+        self.embeds_sent = 0
+
+    @property
+    def depth(self) -> int:
+        return sum(len(buffer) for buffer in self._buffers.values())
+
+    def post(self, channel_id: int, embed: discord.Embed):
+        buffer = self._buffers.setdefault(channel_id, [])
+        buffer.append(embed)
+        if len(buffer) >= MAX_EMBEDS_PER_MESSAGE:
+            self._spawn(self._flush(channel_id))
+        elif channel_id not in self._timers:
+            self._timers[channel_id] = self._spawn(self._flush_later(channel_id))
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _flush_later(self, channel_id: int):
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self._timers.pop(channel_id, None)
+        await self._flush(channel_id)
+
+    def _take_batch(self, buffer: list[discord.Embed]) -> list[discord.Embed]:
+        batch, chars = [], 0
+        while buffer and len(batch) < MAX_EMBEDS_PER_MESSAGE:
+            size = len(buffer[0])
+            if batch and chars + size > MAX_EMBED_CHARS_PER_MESSAGE:
+                break
+            batch.append(buffer.pop(0))
+            chars += size
+        return batch
+
+    async def _flush(self, channel_id: int):
+        lock = self._locks.setdefault(channel_id, asyncio.Lock())
+        async with lock:
+            buffer = self._buffers.get(channel_id)
+            channel = self.bot.get_partial_messageable(channel_id)
+            while buffer:
+                batch = self._take_batch(buffer)
+                try:
+                    await channel.send(embeds=batch)
+                except discord.HTTPException as e:
+                    log.warning("Dropped %d log embeds for channel %s: %s", len(batch), channel_id, e)
+                    continue
+                self.messages_sent += 1
+                self.embeds_sent += len(batch)
+
+    async def close(self):
+        for task in list(self._timers.values()):
+            task.cancel()
+        self._timers.clear()
+        await asyncio.gather(*(self._flush(channel_id) for channel_id in list(self._buffers)))
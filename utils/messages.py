@@ -0,0 +1,46 @@
+# utils/messages.py
+import logging
+
+import discord
+
+log = logging.getLogger(__name__)
+
+
+class MessageHandle:
+    """A bot-posted message tracked by channel id and message id.
+
+    Edits go through a PartialMessage, so no fetch (and no extra rate-limit
+    bucket hit) is needed before changing a message the bot already knows about.
+    """
+
+    __slots__ = ("channel_id", "message_id")
+
+    def __init__(self, channel_id: int, message_id: int):
+        self.channel_id = channel_id
+        self.message_id = message_id
+
+    @classmethod
+    def from_ids(cls, channel_id: int | None, message_id: int | None) -> "MessageHandle | None":
+        if channel_id and message_id:
+            return cls(int(channel_id), int(message_id))
+        return None
+
+    def partial(self, client: discord.Client) -> discord.PartialMessage:
+        return client.get_partial_messageable(self.channel_id).get_partial_message(self.message_id)
+
+    async def edit(self, client: discord.Client, **fields) -> bool:
+        """Edit the message in one request. Returns False if it has been deleted."""
+        try:
+            await self.partial(client).edit(**fields)
+        except discord.NotFound:
+            return False
+        except discord.HTTPException as e:
+            log.warning("Could not edit message %s in %s: %s", self.message_id, self.channel_id, e)
+        return True
+
+    async def delete(self, client: discord.Client) -> bool:
+        try:
+            await self.partial(client).delete()
+        except discord.NotFound:
+            return False
+        return True
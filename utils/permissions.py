@@ -0,0 +1,99 @@
+# utils/permissions.py
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+DEFAULT_DENIAL = "You do not have permission to use this command."
+
+
+class PermissionDenied(app_commands.CheckFailure):
+    """Raised by ``require()``; the tree's error handler sends ``str(error)`` to the user."""
+
+
+class PermissionService:
+    """Answers role-membership questions from precomputed role-id sets.
+
+    Each member's role ids are held as a frozenset keyed by (guild id, member id),
+    so a check is a set lookup instead of a scan over ``member.roles``. The sets are
+    built when the gateway is ready and kept current from member and role events.
+    A member the index has not seen yet is indexed on first lookup.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self._roles: dict[tuple[int, int], frozenset[int]] = {}
+        for event in ("on_ready", "on_guild_join", "on_guild_remove", "on_member_join",
+                      "on_member_update", "on_member_remove", "on_guild_role_delete"):
+            bot.add_listener(getattr(self, f"_{event}"), event)
+
+    def __len__(self) -> int:
+        return len(self._roles)
+
+    # ---------------- Queries ----------------
+    def roles_of(self, user: discord.abc.User) -> frozenset[int]:
+        """Role ids held by ``user``; empty outside a guild."""
+        guild = getattr(user, "guild", None)
+        if guild is None:
+            return frozenset()
+        key = (guild.id, user.id)
+        roles = self._roles.get(key)
+        if roles is None:
+            roles = self._index(user)
+        return roles
+
+    def has_role(self, user: discord.abc.User, role_id: int) -> bool:
+        return role_id in self.roles_of(user)
+
+    def has_any(self, user: discord.abc.User, role_ids, users=()) -> bool:
+        """True if ``user`` holds any of ``role_ids`` or is one of the ``users`` overrides."""
+        return user.id in users or not self.roles_of(user).isdisjoint(role_ids)
+
+    # ---------------- Index upkeep ----------------
+    def _index(self, member: discord.Member) -> frozenset[int]:
+        roles = frozenset(role.id for role in member.roles)
+        self._roles[(member.guild.id, member.id)] = roles
+        return roles
+
+    def _index_guild(self, guild: discord.Guild):
+        for member in guild.members:
+            self._index(member)
+
+    def _forget_guild(self, guild_id: int):
+        self._roles = {key: roles for key, roles in self._roles.items() if key[0] != guild_id}
+
+    async def _on_ready(self):
+        self._roles.clear()
+        for guild in self.bot.guilds:
+            self._index_guild(guild)
+
+    async def _on_guild_join(self, guild: discord.Guild):
+        self._index_guild(guild)
+
+    async def _on_guild_remove(self, guild: discord.Guild):
+        self._forget_guild(guild.id)
+
+    async def _on_member_join(self, member: discord.Member):
+        self._index(member)
+
+    async def _on_member_update(self, before: discord.Member, after: discord.Member):
+        self._index(after)
+
+    async def _on_member_remove(self, member: discord.Member):
+        self._roles.pop((member.guild.id, member.id), None)
+
+    async def _on_guild_role_delete(self, role: discord.Role):
+        # Deleting a role sends no member updates, so strip it from every set that holds it
+        for key, roles in self._roles.items():
+            if key[0] == role.guild.id and role.id in roles:
+                self._roles[key] = roles - {role.id}
+
+
+def require(*role_ids: int, users: tuple[int, ...] = (), message: str = DEFAULT_DENIAL):
+    """App command check: the invoker must hold one of ``role_ids`` or be one of ``users``."""
+
+    async def predicate(interaction: discord.Interaction) -> bool:
+        if interaction.client.permissions.has_any(interaction.user, role_ids, users):
+            return True
+        raise PermissionDenied(message)
+
+    return app_commands.check(predicate)
@@ -0,0 +1,77 @@
+# utils/persistence.py
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable
+
+from utils.storage import Storage
+
+log = logging.getLogger(__name__)
+
+FLUSH_DELAY = 0.25  # seconds a write may wait for others to join its batch
+
+
+class Persistence:
+    """Runs all disk work on one background thread so coroutines never block on I/O.
+
+    ``write(key, fn, *args)`` queues a write and returns immediately. A later write
+    with the same key replaces the queued one, so a burst of updates to one record
+    reaches disk once. Queued writes are flushed together in a single
+    storage transaction shortly after the first one arrives.
+
+    ``run(fn, *args)`` executes a read on the same thread after flushing queued
+    writes, so reads always observe earlier writes.
+    """
+
+    def __init__(self, storage: Storage, delay: float = FLUSH_DELAY):
+        self.storage = storage
+        self.delay = delay
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persistence")
+        self._pending: dict[Hashable, tuple[Callable, tuple]] = {}
+        self._flush_task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def write(self, key: Hashable, fn: Callable, *args):
+        # Re-queue at the end so the batch applies writes in the order of their latest update
+        self._pending.pop(key, None)
+        self._pending[key] = (fn, args)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def run(self, fn: Callable, *args):
+        await self.flush()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._apply, batch)
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.delay)
+        await self.flush()
+
+    def _apply(self, batch: dict[Hashable, tuple[Callable, tuple]]):
+        try:
+            with self.storage.transaction():
+                for fn, args in batch.values():
+                    fn(*args)
+            return
+        except Exception:
+            log.exception("Batched write failed; retrying %d writes one at a time", len(batch))
+        # The batch was rolled back; apply what we can so one bad write doesn't drop the rest
+        for key, (fn, args) in batch.items():
+            try:
+                fn(*args)
+            except Exception:
+                log.exception("Write %r failed", key)
+
+    async def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+        await self.flush()
+        self._executor.shutdown(wait=True)
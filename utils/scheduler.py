@@ -0,0 +1,99 @@
+# utils/scheduler.py
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, Hashable
+
+log = logging.getLogger(__name__)
+
+DueCallback = Callable[[list[Hashable]], Awaitable[None]]
+
+
+class DeadlineScheduler:
+    """Fires keys at wall-clock deadlines from a single task.
+
+    Deadlines sit in a min-heap; the task sleeps exactly until the earliest one
+    and wakes early only when an earlier deadline is scheduled. Rescheduling or
+    cancelling a key is O(log n): the old heap entry is left behind and skipped
+    when it surfaces.
+    """
+
+    def __init__(self, batch_size: int = 50):
+        self.batch_size = batch_size
+        self._heap: list[tuple[float, int, Hashable]] = []
+        self._deadlines: dict[Hashable, float] = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def __contains__(self, key):
+        return key in self._deadlines
+
+    def deadline(self, key: Hashable) -> float | None:
+        return self._deadlines.get(key)
+
+    def schedule(self, key: Hashable, when: float):
+        """Set (or move) the deadline for ``key`` to the Unix timestamp ``when``."""
+        self._deadlines[key] = when
+        heapq.heappush(self._heap, (when, next(self._seq), key))
+        if self._heap[0][2] == key:
+            self._wakeup.set()
+        # Rebuild once stale entries dominate so the heap stays proportional to live keys
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(w, next(self._seq), k) for k, w in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def cancel(self, key: Hashable):
+        self._deadlines.pop(key, None)
+
+    def start(self, callback: DueCallback):
+        """Run ``callback`` with each batch of keys whose deadline has passed."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(callback))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _is_live(self, entry: tuple[float, int, Hashable]) -> bool:
+        return self._deadlines.get(entry[2]) == entry[0]
+
+    def _pop_due(self, now: float) -> list[Hashable]:
+        due = []
+        while self._heap and len(due) < self.batch_size and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if self._is_live(entry):
+                del self._deadlines[entry[2]]
+                due.append(entry[2])
+        return due
+
+    async def _run(self, callback: DueCallback):
+        while True:
+            while self._heap and not self._is_live(self._heap[0]):
+                heapq.heappop(self._heap)
+
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due = self._pop_due(time.time())
+            if due:
+                try:
+                    await callback(due)
+                except Exception:
+                    log.exception("Deadline callback failed for %d keys", len(due))
@@ -0,0 +1,41 @@
+# utils/startup.py
+import time
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    """Wall-clock timings for each startup phase and each cog, reported once the bot is ready.
+
+    A cog's setup time is spent in ``add_cog`` (including ``cog_load``); whatever
+    remains of its extension load is import and module-level work.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.cog_load: dict[str, float] = {}
+        self.cog_setup: dict[str, float] = {}
+        self.failed: dict[str, str] = {}
+        self.reported = False
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started
+
+    def mark(self, name: str, since: float):
+        self.phases[name] = time.perf_counter() - since
+
+    def report(self) -> str:
+        lines = [f"Startup took {time.perf_counter() - self.started:.2f}s"]
+        lines += [f"  {name:<14} {seconds * 1000:8.1f} ms" for name, seconds in self.phases.items()]
+        for module, total in sorted(self.cog_load.items(), key=lambda item: -item[1]):
+            setup = self.cog_setup.get(module, 0.0)
+            lines.append(
+                f"  {module:<22} import {(total - setup) * 1000:7.1f} ms  setup {setup * 1000:7.1f} ms"
+            )
+        lines += [f"  {module:<22} FAILED: {error}" for module, error in self.failed.items()]
+        return "\n".join(lines)
@@ -0,0 +1,353 @@
+# utils/storage.py
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS loas (
+    user_id INTEGER PRIMARY KEY,
+    status TEXT NOT NULL,
+    begin_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    end_ts REAL,
+    reason TEXT NOT NULL DEFAULT '',
+    message_id INTEGER,
+    channel_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS loas_status ON loas(status);
+CREATE INDEX IF NOT EXISTS loas_end_ts ON loas(end_ts);
+
+CREATE TABLE IF NOT EXISTS ztps (
+    user_id INTEGER PRIMARY KEY,
+    issued REAL NOT NULL,
+    length_days INTEGER NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ztps_expires ON ztps(expires);
+
+CREATE TABLE IF NOT EXISTS authorizations (
+    user_id INTEGER PRIMARY KEY,
+    action TEXT NOT NULL,
+    access_level INTEGER NOT NULL,
+    authorized_by INTEGER,
+    timestamp TEXT
+);
+
+CREATE TABLE IF NOT EXISTS timers (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    due REAL NOT NULL,
+    payload TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS timers_due ON timers(due);
+
+CREATE TABLE IF NOT EXISTS tickets (
+    user_id INTEGER PRIMARY KEY,
+    thread_id INTEGER NOT NULL UNIQUE,
+    opened_at REAL NOT NULL,
+    elevated_to TEXT
+);
+
+CREATE TABLE IF NOT EXISTS dm_dead_letters (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    created REAL NOT NULL,
+    error TEXT,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS dm_dead_letters_user ON dm_dead_letters(user_id);
+
+CREATE TABLE IF NOT EXISTS discipline_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    officer_id INTEGER NOT NULL,
+    issuer_id INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    punishment TEXT NOT NULL,
+    reason TEXT NOT NULL DEFAULT '',
+    evidence TEXT NOT NULL DEFAULT '',
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS discipline_history_officer ON discipline_history(officer_id, created);
+CREATE INDEX IF NOT EXISTS discipline_history_issuer ON discipline_history(issuer_id, created);
+CREATE INDEX IF NOT EXISTS discipline_history_action ON discipline_history(action, created);
+CREATE INDEX IF NOT EXISTS discipline_history_created ON discipline_history(created);
+"""
+
+# Files the bot used before the SQLite store; imported once by migrate_json() and then
+# renamed with this suffix so nobody keeps editing files the bot no longer reads
+LEGACY_LOA_FILE = "loa_store.json"
+LEGACY_ZTP_FILE = "ztp.json"
+LEGACY_AUTH_FILE = "authorization_logs.json"
+MIGRATED_SUFFIX = ".migrated"
+
+LOA_DATE_FORMAT = "%m/%d/%Y"
+
+
+def _date_ts(text: str) -> float | None:
+    try:
+        return datetime.strptime(text, LOA_DATE_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _read_json(path: Path, default):
+    if not path.exists():
+        return default
+    try:
+        text = path.read_text(encoding="utf-8").strip()
+        return json.loads(text) if text else default
+    except Exception:
+        log.exception("Could not read legacy file %s", path)
+        return default
+
+
+class Storage:
+    """Single SQLite database (WAL mode) backing the LOA, ZTP and authorization data.
+
+    The connection is shared between threads and guarded by a lock, so methods
+    may be called from the event loop or from an executor thread.
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._depth = 0
+        # isolation_level=None: transactions are managed explicitly by transaction()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Group writes into one commit. Nested calls join the outer transaction."""
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self._conn
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self._conn.execute("COMMIT")
+
+    def _execute(self, sql: str, params=()):
+        with self.transaction() as conn:
+            conn.execute(sql, params)
+
+    def _query(self, sql: str, params=()) -> list[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def data_version(self) -> int:
+        """Changes whenever another connection (another process, the sqlite3 CLI) commits."""
+        return self._query("PRAGMA data_version")[0][0]
+
+    # ---------------- Meta ----------------
+    def get_meta(self, key: str) -> str | None:
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0]["value"] if rows else None
+
+    def set_meta(self, key: str, value: str):
+        self._execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # ---------------- LOA ----------------
+    # Records use the same shape as the LOA cog's in-memory store:
+    # {"status", "begin", "end", "reason", "message_id", "channel_id"} keyed by str(user_id)
+    def load_loas(self) -> dict[str, dict]:
+        rows = self._query("SELECT * FROM loas")
+        return {
+            str(row["user_id"]): {
+                "status": row["status"],
+                "begin": row["begin_date"],
+                "end": row["end_date"],
+                "reason": row["reason"],
+                "message_id": row["message_id"],
+                "channel_id": row["channel_id"],
+            }
+            for row in rows
+        }
+
+    def save_loa(self, user_id: int | str, record: dict):
+        self._execute(
+            "INSERT OR REPLACE INTO loas "
+            "(user_id, status, begin_date, end_date, end_ts, reason, message_id, channel_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                int(user_id),
+                record["status"],
+                record["begin"],
+                record["end"],
+                _date_ts(record["end"]),
+                record.get("reason", ""),
+                record.get("message_id"),
+                record.get("channel_id"),
+            ),
+        )
+
+    def delete_loa(self, user_id: int | str):
+        self._execute("DELETE FROM loas WHERE user_id = ?", (int(user_id),))
+
+    # ---------------- ZTP ----------------
+    def get_ztp(self, user_id: int) -> dict | None:
+        rows = self._query("SELECT issued, length_days, expires FROM ztps WHERE user_id = ?", (user_id,))
+        return dict(rows[0]) if rows else None
+
+    def load_ztp_expiries(self) -> dict[int, float]:
+        return {row["user_id"]: row["expires"] for row in self._query("SELECT user_id, expires FROM ztps")}
+
+    def save_ztp(self, user_id: int, issued: float, length_days: int):
+        self._execute(
+            "INSERT OR REPLACE INTO ztps (user_id, issued, length_days, expires) VALUES (?, ?, ?, ?)",
+            (user_id, issued, length_days, issued + length_days * 86400),
+        )
+
+    def delete_ztp(self, user_id: int):
+        self._execute("DELETE FROM ztps WHERE user_id = ?", (user_id,))
+
+    # ---------------- Authorization ----------------
+    def get_authorization(self, user_id: int) -> dict | None:
+        rows = self._query("SELECT * FROM authorizations WHERE user_id = ?", (user_id,))
+        return dict(rows[0]) if rows else None
+
+    def load_authorizations(self) -> list[dict]:
+        return [dict(row) for row in self._query("SELECT * FROM authorizations")]
+
+    def save_authorization(self, user_id: int, action: str, access_level: int, authorized_by: int, timestamp: str):
+        # One row per user: a new decision replaces the previous one
+        self._execute(
+            "INSERT OR REPLACE INTO authorizations (user_id, action, access_level, authorized_by, timestamp) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (user_id, action, access_level, authorized_by, timestamp),
+        )
+
+    # ---------------- Timers ----------------
+    def load_timers(self) -> list[dict]:
+        rows = self._query("SELECT kind, key, due, payload FROM timers ORDER BY due")
+        return [{**dict(row), "payload": json.loads(row["payload"])} for row in rows]
+
+    def save_timer(self, kind: str, key: str, due: float, payload: dict):
+        self._execute(
+            "INSERT OR REPLACE INTO timers (kind, key, due, payload) VALUES (?, ?, ?, ?)",
+            (kind, key, due, json.dumps(payload)),
+        )
+
+    def delete_timer(self, kind: str, key: str):
+        self._execute("DELETE FROM timers WHERE kind = ? AND key = ?", (kind, key))
+
+    # ---------------- Contact tickets ----------------
+    def load_tickets(self) -> list[dict]:
+        return [dict(row) for row in self._query("SELECT * FROM tickets")]
+
+    def save_ticket(self, user_id: int, thread_id: int, opened_at: float):
+        self._execute(
+            "INSERT OR REPLACE INTO tickets (user_id, thread_id, opened_at) VALUES (?, ?, ?)",
+            (user_id, thread_id, opened_at),
+        )
+
+    def set_ticket_elevation(self, user_id: int, elevated_to: str):
+        self._execute("UPDATE tickets SET elevated_to = ? WHERE user_id = ?", (elevated_to, user_id))
+
+    def delete_ticket(self, user_id: int):
+        self._execute("DELETE FROM tickets WHERE user_id = ?", (user_id,))
+
+    # ---------------- DM dead letters ----------------
+    def save_dm_dead_letter(self, user_id: int, created: float, error: str, summary: str):
+        self._execute(
+            "INSERT INTO dm_dead_letters (user_id, created, error, summary) VALUES (?, ?, ?, ?)",
+            (user_id, created, error, summary),
+        )
+
+    # ---------------- Discipline history ----------------
+    # Append-only: records are never updated or deleted by the bot
+    def add_discipline_record(
+        self, officer_id: int, issuer_id: int, action: str, punishment: str, reason: str, evidence: str, created: float
+    ):
+        self._execute(
+            "INSERT INTO discipline_history (officer_id, issuer_id, action, punishment, reason, evidence, created) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (officer_id, issuer_id, action, punishment, reason, evidence, created),
+        )
+
+    def discipline_history(
+        self,
+        officer_id: int | None = None,
+        issuer_id: int | None = None,
+        action: str | None = None,
+        since: float | None = None,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> tuple[int, list[dict]]:
+        """One page of matching records, newest first, and the total number of matches."""
+        clauses, params = [], []
+        for column, value in (("officer_id", officer_id), ("issuer_id", issuer_id), ("action", action)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("created >= ?")
+            params.append(since)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        total = self._query(f"SELECT COUNT(*) AS n FROM discipline_history{where}", params)[0]["n"]
+        rows = self._query(
+            f"SELECT * FROM discipline_history{where} ORDER BY created DESC, id DESC LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        )
+        return total, [dict(row) for row in rows]
+
+    # ---------------- Migration ----------------
+    def migrate_json(self, base: Path | str = "."):
+        """Import the legacy JSON files once, then rename them aside with MIGRATED_SUFFIX."""
+        if self.get_meta("json_migrated"):
+            return
+        base = Path(base)
+        legacy = [base / name for name in (LEGACY_LOA_FILE, LEGACY_ZTP_FILE, LEGACY_AUTH_FILE)]
+
+        loas = _read_json(base / LEGACY_LOA_FILE, {})
+        ztps = _read_json(base / LEGACY_ZTP_FILE, {})
+        auths = _read_json(base / LEGACY_AUTH_FILE, [])
+
+        with self.transaction():
+            for uid, record in loas.items():
+                self.save_loa(uid, record)
+            for uid, record in ztps.items():
+                self.save_ztp(int(uid), float(record["issued"]), int(record["length_days"]))
+            for entry in auths:
+                # Later entries win, matching the old "remove previous then append" behaviour
+                self.save_authorization(
+                    int(entry["id"]),
+                    entry.get("action", "Denied"),
+                    int(entry.get("access_level", 0)),
+                    entry.get("authorized_by"),
+                    entry.get("timestamp"),
+                )
+            self.set_meta("json_migrated", datetime.now(timezone.utc).isoformat())
+
+        for path in legacy:
+            if path.exists():
+                path.replace(path.with_name(path.name + MIGRATED_SUFFIX))
+
+        log.info("Migrated legacy JSON: %d LOAs, %d ZTPs, %d authorizations", len(loas), len(ztps), len(auths))
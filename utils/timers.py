@@ -0,0 +1,99 @@
+# utils/timers.py
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from discord.ext import commands
+
+from utils.scheduler import DeadlineScheduler
+
+log = logging.getLogger(__name__)
+
+TimerHandler = Callable[[str, dict], Awaitable[None]]
+
+TIMER_BATCH_SIZE = 25  # timers fired concurrently per batch (e.g. a backlog of overdue timers after downtime)
+TIMER_RETRY_DELAY = 30  # seconds before the first retry of a failed handler; doubles on each further failure
+TIMER_MAX_ATTEMPTS = 8  # handler runs before a failing timer is dropped (about two hours of retries)
+
+
+class TimerService:
+    """Durable one-shot timers stored in the ``timers`` table.
+
+    A timer is identified by ``(kind, key)`` and carries a JSON payload. Cogs
+    register one handler per kind; the handler is awaited with ``(key, payload)``
+    when the timer is due, after which the timer is deleted. A handler that raises
+    is retried with exponential backoff, up to TIMER_MAX_ATTEMPTS runs. Timers are
+    reloaded at startup, so pending work survives restarts, and all of them share
+    a single DeadlineScheduler task.
+    """
+
+    def __init__(self, bot: commands.Bot, batch_size: int = TIMER_BATCH_SIZE):
+        self.bot = bot
+        self._handlers: dict[str, TimerHandler] = {}
+        self._payloads: dict[tuple[str, str], dict] = {}
+        self._attempts: dict[tuple[str, str], int] = {}  # failed runs so far; reset by a restart
+        self._schedule = DeadlineScheduler(batch_size=batch_size)
+
+    def __len__(self):
+        return len(self._payloads)
+
+    def register(self, kind: str, handler: TimerHandler):
+        self._handlers[kind] = handler
+
+    def schedule(self, kind: str, key: str, due: float, payload: dict | None = None):
+        """Create or replace the timer ``(kind, key)`` due at Unix time ``due``."""
+        payload = payload or {}
+        self._payloads[(kind, key)] = payload
+        self._attempts.pop((kind, key), None)
+        self._schedule.schedule((kind, key), due)
+        self.bot.persistence.write(("timer", kind, key), self.bot.storage.save_timer, kind, key, due, payload)
+
+    def cancel(self, kind: str, key: str):
+        self._payloads.pop((kind, key), None)
+        self._attempts.pop((kind, key), None)
+        self._schedule.cancel((kind, key))
+        self.bot.persistence.write(("timer", kind, key), self.bot.storage.delete_timer, kind, key)
+
+    async def start(self):
+        """Load persisted timers and start firing them. Call after cogs have registered handlers."""
+        for timer in await self.bot.persistence.run(self.bot.storage.load_timers):
+            key = (timer["kind"], timer["key"])
+            self._payloads[key] = timer["payload"]
+            self._schedule.schedule(key, timer["due"])
+        log.info("Loaded %d pending timers", len(self._payloads))
+        self._schedule.start(self._fire)
+
+    def stop(self):
+        self._schedule.stop()
+
+    async def _fire(self, keys: list[tuple[str, str]]):
+        # Handlers talk to Discord, so wait for the cache before running overdue timers at startup
+        await self.bot.wait_until_ready()
+        await asyncio.gather(*(self._run(kind, key) for kind, key in keys))
+
+    async def _run(self, kind: str, key: str):
+        payload = self._payloads.pop((kind, key), None)
+        handler = self._handlers.get(kind)
+        try:
+            if handler is None:
+                log.warning("No handler registered for timer kind %r; dropping %r", kind, key)
+            elif payload is not None:
+                await handler(key, payload)
+        except Exception:
+            attempt = self._attempts.pop((kind, key), 0) + 1
+            if (kind, key) in self._payloads:
+                log.exception("Timer %s:%s failed; it was rescheduled meanwhile", kind, key)
+                return
+            if attempt < TIMER_MAX_ATTEMPTS:
+                delay = TIMER_RETRY_DELAY * 2 ** (attempt - 1)
+                log.exception("Timer %s:%s failed (attempt %d); retrying in %ds", kind, key, attempt, delay)
+                self.schedule(kind, key, time.time() + delay, payload)
+                self._attempts[(kind, key)] = attempt
+                return
+            log.exception("Timer %s:%s failed %d times; dropping it", kind, key, attempt)
+        else:
+            self._attempts.pop((kind, key), None)
+
+        if (kind, key) not in self._payloads:  # the handler may have rescheduled it
+            self.bot.persistence.write(("timer", kind, key), self.bot.storage.delete_timer, kind, key)
@@ -0,0 +1,77 @@
+# utils/web.py
+import asyncio
+import logging
+import time
+
+from aiohttp import web
+from discord.ext import commands
+
+log = logging.getLogger(__name__)
+
+LAG_INTERVAL = 0.5  # seconds between event-loop lag samples
+
+
+class StatusServer:
+    """Health check and metrics endpoint served from the bot's own event loop.
+
+    ``GET /`` answers 200 while the gateway socket is open and the cache is ready,
+    and 503 otherwise, with the heartbeat latency and event-loop lag in the body.
+    ``GET /metrics`` renders ``bot.metrics`` in the Prometheus text format.
+    """
+
+    def __init__(self, bot: commands.Bot, port: int, host: str = "0.0.0.0"):
+        self.bot = bot
+        self.port = port
+        self.host = host
+        self.loop_lag = 0.0       # latest sample, seconds
+        self.loop_lag_max = 0.0
+        self._runner: web.AppRunner | None = None
+        self._lag_task: asyncio.Task | None = None
+
+        bot.metrics.gauge("event_loop_lag_seconds", "Latest event loop scheduling delay.", lambda: self.loop_lag)
+        bot.metrics.gauge("event_loop_lag_max_seconds", "Largest event loop delay seen.", lambda: self.loop_lag_max)
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/", self.health)
+        app.router.add_get("/metrics", self.metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self._lag_task = asyncio.create_task(self._measure_lag())
+        log.info("Status server listening on %s:%d", self.host, self.port)
+
+    async def stop(self):
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _measure_lag(self):
+        # A sleep that overshoots means something held the loop for that long
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(LAG_INTERVAL)
+            self.loop_lag = max(0.0, time.perf_counter() - started - LAG_INTERVAL)
+            self.loop_lag_max = max(self.loop_lag_max, self.loop_lag)
+
+    async def health(self, request: web.Request) -> web.Response:
+        # is_ready() stays set through gateway disconnects, so it only says the cache was filled;
+        # the live socket says whether the bot is connected right now
+        ws = self.bot.ws
+        connected = ws is not None and ws.open and not self.bot.is_closed()
+        ready = self.bot.is_ready()
+        healthy = connected and ready
+        latency = self.bot.latency
+        body = {
+            "status": "ok" if healthy else "unavailable",
+            "gateway_connected": connected,
+            "cache_ready": ready,
+            "gateway_latency_ms": round(latency * 1000, 1) if latency == latency else None,  # NaN before the first heartbeat
+            "loop_lag_ms": round(self.loop_lag * 1000, 1),
+        }
+        return web.json_response(body, status=200 if healthy else 503)
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.bot.metrics.render(), content_type="text/plain", charset="utf-8")